@@ -3,6 +3,12 @@ ASGI config for Triplicity project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Checkout (bookings.views.create_booking) is an async view, so serve the
+site through this entry point to keep workers free while the payment
+gateway responds, e.g.:
+
+    gunicorn Triplicity.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -66,6 +66,7 @@ LOCAL_APPS = [
     'bookings',
     'reviews',
     'home',
+    'jobqueue',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -119,6 +120,26 @@ DATABASES = {
         },
     }
 }
+# Cache
+# Rendered package pages and their version stamps live here. Set REDIS_URL in
+# production so every worker shares one cache and sees the same versions.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_prometheus.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -155,6 +176,12 @@ USE_TZ = True
 
 STRIPE_PUBLIC_KEY = config('STRIPE_PUBLIC_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
+STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+
+# 'stripe' in production; 'fake' swaps in bookings.gateway.FakeGateway so
+# checkout can be exercised and load-tested without reaching Stripe.
+PAYMENT_GATEWAY = config('PAYMENT_GATEWAY', default='stripe')
+FAKE_GATEWAY_LATENCY = config('FAKE_GATEWAY_LATENCY', default=0.0, cast=float)
 
 # Static files (CSS, JavaScript, Images)
 
@@ -181,6 +208,8 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
+# Absolute links in emails sent outside a request (campaigns, job workers).
+SITE_URL = config('SITE_URL', default='http://127.0.0.1:8000')
 
 
 # Login/Logout URLs
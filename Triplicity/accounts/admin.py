@@ -4,15 +4,19 @@ from django.contrib import admin
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, EmailVerificationOTP
+from packages.pagination import EstimatedCountPaginator
+from .models import User, EmailVerificationOTP, MailCampaign
 
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
     list_display = ('email', 'username', 'first_name', 'last_name', 'is_email_verified', 'is_staff', 'created_at')
-    list_filter = ('is_email_verified', 'is_staff', 'is_superuser', 'is_active', 'created_at')
+    list_filter = ('is_email_verified', 'is_staff', 'is_superuser', 'is_active')
     search_fields = ('email', 'username', 'first_name', 'last_name')
     ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = UserAdmin.fieldsets + (
         ('Extended Profile', {
@@ -37,5 +41,13 @@ class CustomUserAdmin(UserAdmin):
 class EmailVerificationOTPAdmin(admin.ModelAdmin):
     list_display = ('user', 'otp_code', 'is_used', 'created_at', 'expires_at')
     list_filter = ('is_used', 'created_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
     search_fields = ('user__email', 'otp_code')
     readonly_fields = ('created_at',)
+
+
+@admin.register(MailCampaign)
+class MailCampaignAdmin(admin.ModelAdmin):
+    list_display = ('name', 'subject', 'sent_count', 'started_at', 'updated_at', 'finished_at')
+    readonly_fields = ('last_user_id', 'sent_count', 'started_at', 'updated_at', 'finished_at')
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+
+
+def send_welcome_email(user, connection=None):
+    """Send enhanced welcome email"""
+    subject = 'Welcome to Triplicity! 🛫'
+    
+    # HTML email content
+    html_message = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f8f9fa; padding: 30px; border-radius: 0 0 10px 10px; }}
+            .footer {{ text-align: center; margin-top: 20px; color: #666; font-size: 12px; }}
+            .btn {{ display: inline-block; padding: 12px 24px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; text-decoration: none; border-radius: 5px; margin: 10px 0; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🛫 Welcome to Triplicity!</h1>
+                <p>Your Travel Adventure Begins Here</p>
+            </div>
+            <div class="content">
+                <h2>Hello {user.get_full_name()}!</h2>
+                <p>Thank you for joining Triplicity! We're excited to help you discover amazing travel destinations and create unforgettable memories.</p>
+                
+                <p><strong>Your Account Details:</strong></p>
+                <ul>
+                    <li><strong>Email:</strong> {user.email}</li>
+                    <li><strong>Account Status:</strong> Active ✅</li>
+                    <li><strong>Registration Date:</strong> {user.date_joined.strftime('%B %d, %Y')}</li>
+                </ul>
+                
+                <p>What's next?</p>
+                <ul>
+                    <li>🏨 Browse our amazing hotel deals</li>
+                    <li>✈️ Discover exciting travel packages</li>
+                    <li>🗺️ Plan your dream vacation</li>
+                    <li>📱 Book with confidence</li>
+                </ul>
+                
+                <div style="text-align: center; margin: 30px 0;">
+                    <a href="http://127.0.0.1:8000/accounts/dashboard/" class="btn">
+                        Go to Your Dashboard
+                    </a>
+                </div>
+                
+                <p>If you have any questions, feel free to contact our support team.</p>
+                
+                <p>Happy travels!<br>
+                <strong>The Triplicity Team</strong></p>
+            </div>
+            <div class="footer">
+                <p>© 2025 Triplicity. All rights reserved.</p>
+                <p>This email was sent to {user.email}</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    
+    # Plain text version
+    plain_message = f"""
+    Welcome to Triplicity, {user.get_full_name()}!
+    
+    Thank you for joining our travel community. Your account has been successfully created.
+    
+    Account Details:
+    - Email: {user.email}
+    - Status: Active
+    - Registration: {user.date_joined.strftime('%B %d, %Y')}
+    
+    Visit your dashboard: http://127.0.0.1:8000/accounts/dashboard/
+    
+    Happy travels!
+    The Triplicity Team
+    """
+    
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=plain_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=connection,
+    )
+    email.attach_alternative(html_message, "text/html")
+    email.send()
@@ -0,0 +1,14 @@
+from jobqueue.queue import register
+
+from .emails import send_welcome_email
+from .models import User
+
+
+@register('accounts.send_welcome_email')
+def welcome_email(user_id, connection=None):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return  # deleted before the worker got to it
+    if connection is not None:
+        connection.open()
+    send_welcome_email(user, connection=connection)
@@ -0,0 +1,142 @@
+import smtplib
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+
+from accounts.models import MailCampaign, User
+from packages.models import Package
+
+# Templates are rendered once with this in place of the recipient's name,
+# which is then swapped in per message.
+NAME_TOKEN = '__RECIPIENT_NAME__'
+
+
+class Command(BaseCommand):
+    help = (
+        "Email every active user about the newest packages. Recipients are streamed "
+        "in batches over one SMTP connection, and progress is checkpointed after "
+        "each batch so re-running the same campaign name resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help="Campaign name; re-running the same name resumes it.")
+        parser.add_argument('--subject', default="New trips on Triplicity")
+        parser.add_argument('--template', default='accounts/emails/new_packages',
+                            help="Template path without the .txt/.html extension.")
+        parser.add_argument('--packages', type=int, default=6,
+                            help="How many of the newest packages to feature.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Recipients fetched and checkpointed at a time.")
+        parser.add_argument('--rate', type=float, default=0,
+                            help="Maximum emails per second (default: unlimited).")
+        parser.add_argument('--restart', action='store_true',
+                            help="Start the campaign over from the first user.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Count recipients and render the email without sending.")
+
+    def handle(self, *args, **options):
+        campaign, _ = MailCampaign.objects.get_or_create(
+            name=options['name'],
+            defaults={'subject': options['subject'], 'template': options['template']},
+        )
+        if options['restart']:
+            campaign.last_user_id = None
+            campaign.sent_count = 0
+            campaign.started_at = timezone.now()
+            campaign.finished_at = None
+            campaign.save()
+        elif campaign.finished_at:
+            self.stdout.write(f"Campaign '{campaign.name}' already finished; use --restart to send it again.")
+            return
+
+        recipients = (
+            User.objects.filter(is_active=True).exclude(email='')
+            .order_by('pk')
+            .only('email', 'first_name', 'last_name')
+        )
+        if campaign.last_user_id:
+            recipients = recipients.filter(pk__gt=campaign.last_user_id)
+
+        text, html = self.render(campaign.template, options['packages'])
+        if options['dry_run']:
+            self.stdout.write(text)
+            self.stdout.write(f"Would send '{campaign.subject}' to {recipients.count()} user(s).")
+            return
+
+        connection = get_connection()
+        connection.open()
+        started = time.monotonic()
+        sent_now = 0
+        failed = 0
+        try:
+            users = recipients.iterator(chunk_size=options['batch_size'])
+            while batch := list(islice(users, options['batch_size'])):
+                accepted = 0
+                for user in batch:
+                    if self.send(connection, self.message(campaign, user, text, html)):
+                        accepted += 1
+                    else:
+                        failed += 1
+                    if options['rate']:
+                        ahead = (sent_now + accepted + failed) / options['rate'] - (time.monotonic() - started)
+                        if ahead > 0:
+                            time.sleep(ahead)
+                # A crash before this line re-sends at most this one batch.
+                # Only messages the server accepted count as sent.
+                sent_now += accepted
+                campaign.last_user_id = batch[-1].pk
+                campaign.sent_count += accepted
+                campaign.save(update_fields=['last_user_id', 'sent_count', 'updated_at'])
+                elapsed = max(time.monotonic() - started, 1e-9)
+                self.stdout.write(f"{campaign.sent_count} sent ({sent_now / elapsed:.0f}/s)")
+        finally:
+            connection.close()
+
+        campaign.finished_at = timezone.now()
+        campaign.save(update_fields=['finished_at', 'updated_at'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Campaign '{campaign.name}' finished: {sent_now} sent this run, {failed} refused."
+        ))
+
+    def render(self, template, package_count):
+        packages = Package.objects.order_by('-created_at').only('title', 'slug', 'duration', 'price')
+        context = {
+            'name': NAME_TOKEN,
+            'packages': list(packages[:package_count]),
+            'site_url': settings.SITE_URL,
+        }
+        return (
+            render_to_string(f'{template}.txt', context),
+            render_to_string(f'{template}.html', context),
+        )
+
+    def message(self, campaign, user, text, html):
+        name = user.get_full_name() or 'traveller'
+        message = EmailMultiAlternatives(
+            subject=campaign.subject,
+            body=text.replace(NAME_TOKEN, name),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[user.email],
+        )
+        message.attach_alternative(html.replace(NAME_TOKEN, escape(name)), 'text/html')
+        return message
+
+    def send(self, connection, message):
+        """
+        Send one message over the shared connection, reconnecting once if the
+        server dropped it. Returns False if the recipient was refused.
+        """
+        try:
+            return bool(connection.send_messages([message]))
+        except smtplib.SMTPRecipientsRefused:
+            return False
+        except smtplib.SMTPServerDisconnected:
+            connection.close()
+            connection.open()
+            return bool(connection.send_messages([message]))
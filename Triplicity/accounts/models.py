@@ -36,6 +36,10 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Admin changelist ordering and date_hierarchy.
+            models.Index(fields=['-created_at'], name='users_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.email})"
@@ -60,3 +64,23 @@ class EmailVerificationOTP(models.Model):
     
     def __str__(self):
         return f"OTP for {self.user.email}: {self.otp_code}"
+
+
+class MailCampaign(models.Model):
+    """Progress of a bulk mailing, so an interrupted send can resume."""
+    name = models.SlugField(max_length=100, unique=True)
+    subject = models.CharField(max_length=200)
+    template = models.CharField(max_length=200)
+    # Users are sent to in primary-key order; everything up to here is done.
+    last_user_id = models.UUIDField(blank=True, null=True)
+    sent_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'mail_campaigns'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.sent_count} sent)"
@@ -1,10 +1,46 @@
 from django.contrib import admin
 
 # Register your models here.
-from django.contrib import admin
-from .models import Booking
+from django.contrib import admin, messages
+from jobqueue.queue import enqueue_many
+from packages.pagination import EstimatedCountPaginator
+from .models import Booking, PaymentEvent
+from .refunds import JOB_SIZE
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'package', 'person_count', 'total_amount', 'status', 'created_at')
-    list_filter = ('status', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('user', 'package')
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user',)
+    autocomplete_fields = ('package', 'departure')
+    search_fields = ('=id', '=payment_intent_id', 'user__email')
+    # Large tables: no exact COUNT(*) for the pager or the "x total" link.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('refund_and_cancel',)
+
+    @admin.action(description="Refund paid and cancel unpaid selected bookings", permissions=('change',))
+    def refund_and_cancel(self, request, queryset):
+        # Hundreds of gateway calls (with backoff) don't fit in a request;
+        # background workers run them, in small jobs that finish long before
+        # a running job would be taken for abandoned.
+        booking_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        chunks = [booking_ids[i:i + JOB_SIZE] for i in range(0, len(booking_ids), JOB_SIZE)]
+        jobs = enqueue_many('bookings.refund_bookings', [{'booking_ids': chunk} for chunk in chunks])
+        self.message_user(
+            request,
+            f"Queued refunds for {len(booking_ids)} booking(s) in {len(jobs)} job(s); failures show up on those jobs.",
+            messages.SUCCESS,
+        )
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'type', 'payment_intent_id', 'received_at', 'processed_at')
+    list_filter = ('type',)
+    search_fields = ('=event_id', '=payment_intent_id')
+    date_hierarchy = 'received_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
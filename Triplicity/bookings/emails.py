@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+
+def send_booking_mail(user, booking, connection=None):
+    subject = f'Your Triplicity Booking #{booking.booking_id} is Confirmed!'
+    message = f"""Dear {user.get_full_name()},
+
+Thank you for booking "{booking.package.title}" ({booking.person_count} person(s), total ₹{booking.total_amount}).
+
+Booking ID: {booking.booking_id}
+Package: {booking.package.title}
+Persons: {booking.person_count}
+Total Paid: ₹{booking.total_amount}
+Booking Date: {booking.created_at.date()}
+Status: Confirmed
+
+We look forward to being a part of your journey!
+- Triplicity Team
+"""
+    # Errors propagate so the job queue retries the send.
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        fail_silently=False,
+        connection=connection,
+    )
@@ -0,0 +1,92 @@
+import atexit
+import os
+import threading
+
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from prometheus_client import Counter
+
+from .models import BookingEvent
+
+# Events are kept in memory and written by a background thread, at least
+# every FLUSH_INTERVAL seconds or as soon as FLUSH_SIZE are waiting, so
+# logging never adds a query to checkout or a webhook.
+FLUSH_INTERVAL = 2.0
+FLUSH_SIZE = 500
+# While the database is unreachable the buffer stops growing here and newer
+# events are dropped (and counted) instead.
+MAX_BUFFERED = 50_000
+
+events_written = Counter('triplicity_booking_events_written', 'Booking events written to the event log.')
+events_dropped = Counter('triplicity_booking_events_dropped', 'Booking events dropped because the buffer was full.')
+
+_buffer = []
+_lock = threading.Lock()
+_wake = threading.Event()
+_flusher = {'pid': None}
+
+
+def record(events, at=None):
+    """
+    Queue ``(booking_id, event)`` pairs for the log and return at once.
+
+    Call it after the change has committed (see transaction.on_commit), so
+    rolled-back changes never reach the log.
+    """
+    at = at or timezone.now()
+    rows = [BookingEvent(booking_id=booking_id, event=event, created_at=at) for booking_id, event in events]
+    with _lock:
+        room = MAX_BUFFERED - len(_buffer)
+        _buffer.extend(rows[:room])
+        full = len(_buffer) >= FLUSH_SIZE
+    if len(rows) > room:
+        events_dropped.inc(len(rows) - room)
+    _start_flusher()
+    if full:
+        _wake.set()
+
+
+def flush():
+    """Write everything buffered so far. Returns the number of events written."""
+    with _lock:
+        batch = _buffer[:]
+        del _buffer[:]
+    if not batch:
+        return 0
+    try:
+        BookingEvent.objects.bulk_create(batch, batch_size=FLUSH_SIZE)
+    except DatabaseError:
+        # Put them back in front of anything newer and try again next time.
+        with _lock:
+            _buffer[:0] = batch[:MAX_BUFFERED]
+            overflow = len(_buffer) - MAX_BUFFERED
+            if overflow > 0:
+                del _buffer[MAX_BUFFERED:]
+                events_dropped.inc(overflow)
+        return 0
+    events_written.inc(len(batch))
+    return len(batch)
+
+
+def _run():
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        close_old_connections()
+        flush()
+
+
+def _start_flusher():
+    # One thread per process; a forked worker starts its own.
+    pid = os.getpid()
+    if _flusher['pid'] == pid:
+        return
+    with _lock:
+        if _flusher['pid'] == pid:
+            return
+        _flusher['pid'] = pid
+    threading.Thread(target=_run, name='booking-event-log', daemon=True).start()
+
+
+# Management commands and worker shutdowns write out what's left.
+atexit.register(flush)
@@ -0,0 +1,74 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .models import Booking
+
+# Output column -> queryset column. user and package are joined in the
+# same query, so each row costs nothing beyond the cursor fetch.
+COLUMNS = {
+    'booking_id': 'id',
+    'created_at': 'created_at',
+    'status': 'status',
+    'persons': 'person_count',
+    'total_amount': 'total_amount',
+    'payment_intent_id': 'payment_intent_id',
+    'user_email': 'user__email',
+    'package_slug': 'package__slug',
+    'package_title': 'package__title',
+    'departure_date': 'departure__date',
+}
+CHUNK_SIZE = 2000
+
+
+def export_queryset(start=None, end=None, status=None):
+    """Bookings in id order, optionally made between two dates (inclusive) and in one status."""
+    bookings = Booking.objects.order_by('pk')
+    if start:
+        bookings = bookings.filter(created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+    if end:
+        bookings = bookings.filter(created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+    if status:
+        bookings = bookings.filter(status=status)
+    return bookings.values_list(*COLUMNS.values())
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    # .iterator() streams through a server-side cursor on Postgres, holding
+    # one chunk in memory at a time.
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object for csv.writer that hands back what it's given."""
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows, rows_per_chunk=500):
+    """Yield the CSV (header first) in strings of ``rows_per_chunk`` lines."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS.keys())
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) == rows_per_chunk:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def aiter_sync(iterator):
+    """
+    Drive a sync iterator from async code one item at a time.
+
+    Under ASGI, Django 4.2 would otherwise read a sync streaming iterator
+    into a list before sending it. Every step runs in the same thread, which
+    the database cursor behind it requires.
+    """
+    done = object()
+    while (item := await sync_to_async(next)(iterator, done)) is not done:
+        yield item
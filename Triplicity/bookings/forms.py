@@ -1,6 +1,46 @@
+import uuid
+
 from django import forms
 
+from packages.models import Departure
+
+
+class DepartureChoiceField(forms.ModelChoiceField):
+    def label_from_instance(self, departure):
+        return f"{departure.date:%d %b %Y} ({departure.seats_left} seats left)"
+
+
 class BookingForm(forms.Form):
+    departure = DepartureChoiceField(queryset=Departure.objects.none(), label='Departure Date', widget=forms.Select(attrs={
+        'class': 'form-select', 'style': 'max-width: 300px;'
+    }))
     person_count = forms.IntegerField(min_value=1, label='Number of Persons', widget=forms.NumberInput(attrs={
         'class': 'form-control', 'style': 'max-width: 150px;'
     }))
+    # One per rendered form, so a double-click or a retried POST is recognised
+    # as the same checkout (see bookings.idempotency).
+    idempotency_key = forms.RegexField(regex=r'^[0-9a-f]{32}$', widget=forms.HiddenInput)
+
+    def __init__(self, *args, package=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['idempotency_key'].initial = uuid.uuid4().hex
+        departures = Departure.objects.none()
+        if package is not None:
+            departures = package.departures.bookable()
+        self.fields['departure'].queryset = departures
+        # Packages without scheduled departures can still be booked as before.
+        if not departures.exists():
+            del self.fields['departure']
+
+    def renew_key(self):
+        """Give a form that is shown again a new key: its next submission is a new checkout."""
+        self.data = self.data.copy()
+        self.data['idempotency_key'] = uuid.uuid4().hex
+
+    def clean(self):
+        cleaned_data = super().clean()
+        departure = cleaned_data.get('departure')
+        person_count = cleaned_data.get('person_count')
+        if departure and person_count and person_count > departure.seats_left:
+            self.add_error('person_count', f"Only {departure.seats_left} seat(s) left on this departure.")
+        return cleaned_data
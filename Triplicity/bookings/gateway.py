@@ -0,0 +1,315 @@
+import abc
+import asyncio
+import hashlib
+import hmac
+import json
+import secrets
+import sys
+import time
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+import stripe
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class PaymentGatewayError(Exception):
+    """The gateway rejected a request or could not be reached."""
+
+
+class InvalidWebhook(PaymentGatewayError):
+    """A webhook payload was malformed or its signature didn't verify."""
+
+
+class RateLimited(PaymentGatewayError):
+    """Too many requests; the same call can be retried after a pause."""
+
+
+@dataclass(frozen=True)
+class PaymentIntent:
+    id: str
+    client_secret: str
+    status: str
+    amount: int
+    currency: str
+    created: int = 0  # Unix timestamp, as the provider reports it
+
+
+@dataclass(frozen=True)
+class IntentPage:
+    intents: list  # of PaymentIntent, newest first
+    has_more: bool
+
+
+@dataclass(frozen=True)
+class Refund:
+    id: str
+    payment_intent_id: str
+    status: str
+    amount: int
+
+
+@dataclass(frozen=True)
+class GatewayEvent:
+    id: str
+    type: str
+    payment_intent_id: str
+    payload: dict
+
+
+class PaymentGateway(abc.ABC):
+    """
+    The few payment operations checkout needs, as non-blocking calls.
+
+    Amounts are always integer minor units (paise/cents).
+    """
+
+    def __init__(self, webhook_secret=''):
+        self.webhook_secret = webhook_secret
+
+    @abc.abstractmethod
+    async def create_intent(self, amount, currency, metadata, description, idempotency_key=None):
+        """
+        Start a payment. Repeating a call with the same ``idempotency_key``
+        returns the original intent instead of creating another.
+        """
+
+    @abc.abstractmethod
+    async def retrieve_intent(self, intent_id):
+        """The current state of an intent."""
+
+    @abc.abstractmethod
+    async def cancel_intent(self, intent_id):
+        """Stop an intent from being paid; raises if it can't be (e.g. it already succeeded)."""
+
+    @abc.abstractmethod
+    async def list_intents(self, created_gte, starting_after=None, limit=100):
+        """
+        One page of intents created at or after ``created_gte`` (a datetime),
+        newest first. Pass the last intent's id as ``starting_after`` for the
+        next page.
+        """
+
+    @abc.abstractmethod
+    async def refund(self, payment_intent_id, idempotency_key=None):
+        """
+        Refund a payment in full. Like ``create_intent``, repeating a call
+        with the same ``idempotency_key`` returns the first refund.
+        """
+
+    def parse_event(self, payload, signature):
+        """
+        Verify a webhook's signature and return it as a GatewayEvent.
+
+        Both gateways use Stripe's signing scheme, which is a local HMAC check
+        and never calls the API.
+        """
+        try:
+            event = stripe.Webhook.construct_event(payload, signature, self.webhook_secret)
+        except (ValueError, stripe.SignatureVerificationError) as exc:
+            raise InvalidWebhook(str(exc)) from exc
+        event = event.to_dict() if hasattr(event, 'to_dict') else dict(event)
+        obj = event.get('data', {}).get('object', {})
+        intent_id = obj.get('id') if obj.get('object') == 'payment_intent' else None
+        return GatewayEvent(id=event['id'], type=event['type'], payment_intent_id=intent_id, payload=event)
+
+
+class StripeGateway(PaymentGateway):
+    def __init__(self, api_key, webhook_secret=''):
+        super().__init__(webhook_secret)
+        self.api_key = api_key
+
+    async def create_intent(self, amount, currency, metadata, description, idempotency_key=None):
+        try:
+            intent = await stripe.PaymentIntent.create_async(
+                api_key=self.api_key,
+                amount=amount,
+                currency=currency,
+                metadata={key: str(value) for key, value in metadata.items()},
+                description=description,
+                idempotency_key=idempotency_key,
+            )
+        except stripe.StripeError as exc:
+            raise PaymentGatewayError(str(exc)) from exc
+        return self._intent(intent)
+
+    async def retrieve_intent(self, intent_id):
+        try:
+            intent = await stripe.PaymentIntent.retrieve_async(intent_id, api_key=self.api_key)
+        except stripe.StripeError as exc:
+            raise PaymentGatewayError(str(exc)) from exc
+        return self._intent(intent)
+
+    async def cancel_intent(self, intent_id):
+        try:
+            intent = await stripe.PaymentIntent.cancel_async(intent_id, api_key=self.api_key)
+        except stripe.RateLimitError as exc:
+            raise RateLimited(str(exc)) from exc
+        except stripe.StripeError as exc:
+            raise PaymentGatewayError(str(exc)) from exc
+        return self._intent(intent)
+
+    async def list_intents(self, created_gte, starting_after=None, limit=100):
+        params = {'created': {'gte': int(created_gte.timestamp())}, 'limit': limit}
+        if starting_after:
+            params['starting_after'] = starting_after
+        try:
+            page = await stripe.PaymentIntent.list_async(api_key=self.api_key, **params)
+        except stripe.RateLimitError as exc:
+            raise RateLimited(str(exc)) from exc
+        except stripe.StripeError as exc:
+            raise PaymentGatewayError(str(exc)) from exc
+        return IntentPage(intents=[self._intent(intent) for intent in page['data']], has_more=page['has_more'])
+
+    async def refund(self, payment_intent_id, idempotency_key=None):
+        try:
+            refund = await stripe.Refund.create_async(
+                api_key=self.api_key,
+                payment_intent=payment_intent_id,
+                idempotency_key=idempotency_key,
+            )
+        except stripe.RateLimitError as exc:
+            raise RateLimited(str(exc)) from exc
+        except stripe.StripeError as exc:
+            raise PaymentGatewayError(str(exc)) from exc
+        return Refund(
+            id=refund['id'],
+            payment_intent_id=refund['payment_intent'],
+            status=refund['status'],
+            amount=refund['amount'],
+        )
+
+    @staticmethod
+    def _intent(intent):
+        return PaymentIntent(
+            id=intent['id'],
+            client_secret=intent['client_secret'],
+            status=intent['status'],
+            amount=intent['amount'],
+            currency=intent['currency'],
+            created=intent['created'],
+        )
+
+
+class FakeGateway(PaymentGateway):
+    """
+    In-memory gateway for tests and offline load testing.
+
+    ``latency`` (seconds) simulates the network round-trip to the provider;
+    ``max_in_flight`` makes it answer RateLimited when more calls than that
+    are outstanding at once, like a provider's concurrency limit.
+    """
+
+    def __init__(self, latency=0.0, webhook_secret='whsec_fake', max_in_flight=None):
+        super().__init__(webhook_secret)
+        self.latency = latency
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.intents = {}
+        self.refunds = {}
+        self.idempotent = {}
+
+    async def create_intent(self, amount, currency, metadata, description, idempotency_key=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if idempotency_key in self.idempotent:
+            return self.intents[self.idempotent[idempotency_key]]
+        intent_id = f'pi_fake_{secrets.token_hex(12)}'
+        intent = PaymentIntent(
+            id=intent_id,
+            client_secret=f'{intent_id}_secret_{secrets.token_hex(8)}',
+            status='requires_payment_method',
+            amount=amount,
+            currency=currency,
+            created=int(time.time()),
+        )
+        self.intents[intent_id] = intent
+        if idempotency_key:
+            self.idempotent[idempotency_key] = intent_id
+        return intent
+
+    async def retrieve_intent(self, intent_id):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            return self.intents[intent_id]
+        except KeyError:
+            raise PaymentGatewayError(f"No such payment_intent: {intent_id}") from None
+
+    async def cancel_intent(self, intent_id):
+        intent = await self.retrieve_intent(intent_id)
+        if intent.status in ('succeeded', 'canceled'):
+            raise PaymentGatewayError(f"You cannot cancel this PaymentIntent because it has a status of {intent.status}.")
+        self.set_status(intent_id, 'canceled')
+        return self.intents[intent_id]
+
+    async def list_intents(self, created_gte, starting_after=None, limit=100):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        since = int(created_gte.timestamp())
+        intents = sorted(
+            (intent for intent in self.intents.values() if intent.created >= since),
+            key=lambda intent: (intent.created, intent.id), reverse=True,
+        )
+        if starting_after:
+            ids = [intent.id for intent in intents]
+            intents = intents[ids.index(starting_after) + 1:] if starting_after in ids else []
+        return IntentPage(intents=intents[:limit], has_more=len(intents) > limit)
+
+    def set_status(self, intent_id, status):
+        """Move an intent along, as the customer paying (or abandoning) would."""
+        self.intents[intent_id] = replace(self.intents[intent_id], status=status)
+
+    async def refund(self, payment_intent_id, idempotency_key=None):
+        if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+            raise RateLimited("Too many requests in flight")
+        self.in_flight += 1
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if idempotency_key in self.idempotent:
+            return self.refunds[self.idempotent[idempotency_key]]
+        if any(refund.payment_intent_id == payment_intent_id for refund in self.refunds.values()):
+            raise PaymentGatewayError(f"Charge for {payment_intent_id} has already been refunded")
+        intent = self.intents.get(payment_intent_id)
+        refund_id = f're_fake_{secrets.token_hex(12)}'
+        refund = Refund(
+            id=refund_id,
+            payment_intent_id=payment_intent_id,
+            status='succeeded',
+            amount=intent.amount if intent else 0,
+        )
+        self.refunds[refund_id] = refund
+        if idempotency_key:
+            self.idempotent[idempotency_key] = refund_id
+        return refund
+
+    def sign_event(self, event_id, event_type, payment_intent_id):
+        """Build a signed webhook (payload, Stripe-Signature header) pair."""
+        payload = json.dumps({
+            'id': event_id,
+            'object': 'event',
+            'type': event_type,
+            'data': {'object': {'id': payment_intent_id, 'object': 'payment_intent'}},
+        })
+        timestamp = int(time.time())
+        digest = hmac.new(
+            self.webhook_secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256,
+        ).hexdigest()
+        return payload, f't={timestamp},v1={digest}'
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    if settings.PAYMENT_GATEWAY == 'fake':
+        webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+        if not webhook_secret:
+            # The fallback secret is public: anyone could sign webhooks with it.
+            if not (settings.DEBUG or 'test' in sys.argv[1:2]):
+                raise ImproperlyConfigured("Set STRIPE_WEBHOOK_SECRET to use PAYMENT_GATEWAY=fake without DEBUG.")
+            webhook_secret = 'whsec_fake'
+        return FakeGateway(latency=settings.FAKE_GATEWAY_LATENCY, webhook_secret=webhook_secret)
+    return StripeGateway(settings.STRIPE_SECRET_KEY, settings.STRIPE_WEBHOOK_SECRET)
@@ -0,0 +1,65 @@
+import asyncio
+import re
+
+from django.core.cache import cache
+
+# A checkout attempt is claimed while it runs; once it has a booking the
+# result replaces the claim so repeats of the same form post can be answered
+# from the cache alone. An attempt that fails is marked so, and the form is
+# shown again with a new key.
+IN_PROGRESS = 'in-progress'
+FAILED = 'failed'
+CLAIM_TIMEOUT = 30          # longer than any gateway call takes
+RESULT_TIMEOUT = 60 * 15    # how long a re-post is answered from the cache
+WAIT_TIMEOUT = 10
+WAIT_INTERVAL = 0.25
+
+KEY_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def is_valid(key):
+    return bool(key and KEY_RE.match(key))
+
+
+def _cache_key(user_id, key):
+    return f'bookings:checkout:{user_id}:{key}'
+
+
+async def claim(user_id, key):
+    """True if this request should run the checkout; False if another already is (or did)."""
+    return await cache.aadd(_cache_key(user_id, key), IN_PROGRESS, CLAIM_TIMEOUT)
+
+
+async def result(user_id, key):
+    """The stored {'booking_id', 'client_secret'} for a finished checkout, or None."""
+    value = await cache.aget(_cache_key(user_id, key))
+    return value if isinstance(value, dict) else None
+
+
+async def wait_for_result(user_id, key):
+    """
+    Wait for a concurrent request with the same key to finish. Returns its
+    result, FAILED if it failed (or died and its claim lapsed), or None if
+    it is still running.
+    """
+    for _ in range(int(WAIT_TIMEOUT / WAIT_INTERVAL)):
+        value = await cache.aget(_cache_key(user_id, key))
+        if isinstance(value, dict):
+            return value
+        if value != IN_PROGRESS:
+            return FAILED
+        await asyncio.sleep(WAIT_INTERVAL)
+    return None
+
+
+async def remember(user_id, key, booking_id, client_secret):
+    await cache.aset(
+        _cache_key(user_id, key),
+        {'booking_id': booking_id, 'client_secret': client_secret},
+        RESULT_TIMEOUT,
+    )
+
+
+async def fail(user_id, key):
+    """Record that the attempt failed, for any request with the same key waiting on it."""
+    await cache.aset(_cache_key(user_id, key), FAILED, RESULT_TIMEOUT)
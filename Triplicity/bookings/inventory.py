@@ -0,0 +1,41 @@
+from collections import Counter
+
+from django.db.models import F
+from django.db.models.functions import Least
+
+from packages.models import Departure
+
+
+def reserve_seats(departure_id, count):
+    """
+    Take ``count`` seats on a departure. Returns False if not enough are left.
+
+    This is one conditional UPDATE, so the row lock is held only for the
+    statement itself: concurrent checkouts on the same departure queue up
+    on that lock instead of deadlocking, and the WHERE clause is re-checked
+    after waiting, so seats can never go below zero.
+    """
+    return Departure.objects.filter(pk=departure_id, seats_left__gte=count).update(
+        seats_left=F('seats_left') - count,
+    ) == 1
+
+
+def release_seats(departure_id, count):
+    """Give seats back (cancelled or failed checkout), never above capacity."""
+    Departure.objects.filter(pk=departure_id).update(
+        seats_left=Least(F('seats_left') + count, F('capacity')),
+    )
+
+
+def release_booked_seats(rows):
+    """
+    Give back the seats held by moved booking rows (from transition_bookings),
+    one UPDATE per departure. Returns the number of seats released.
+    """
+    seats = Counter()
+    for row in rows:
+        if row.departure_id:
+            seats[row.departure_id] += row.person_count
+    for departure_id, count in seats.items():
+        release_seats(departure_id, count)
+    return sum(seats.values())
@@ -0,0 +1,26 @@
+from jobqueue.queue import register
+
+from .emails import send_booking_mail
+from .gateway import PaymentGatewayError
+from .models import Booking
+from .refunds import refund_bookings
+
+
+@register('bookings.send_booking_mail')
+def booking_mail(booking_id, connection=None):
+    booking = Booking.objects.select_related('user', 'package').filter(pk=booking_id).first()
+    if booking is None:
+        return
+    if connection is not None:
+        connection.open()
+    send_booking_mail(booking.user, booking, connection=connection)
+
+
+@register('bookings.refund_bookings')
+def refund_selected(booking_ids, connection=None):
+    # Safe to retry: refunded/cancelled bookings are skipped and refunds are
+    # keyed per booking.
+    result = refund_bookings(Booking.objects.filter(pk__in=booking_ids))
+    if result.failed:
+        failed = ', '.join(f"#{pk}: {error}" for pk, error in sorted(result.failed.items()))
+        raise PaymentGatewayError(f"Could not refund {len(result.failed)} booking(s): {failed}")
@@ -0,0 +1,84 @@
+import random
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookings.inventory import reserve_seats
+from packages.models import Departure, Package
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one departure with concurrent seat reservations from many threads "
+        "and check that it never oversells. Creates and deletes its own departure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=50)
+        parser.add_argument('--attempts', type=int, default=20, help="Reservations tried per thread.")
+        parser.add_argument('--capacity', type=int, default=500)
+        parser.add_argument('--max-party', type=int, default=4, help="Largest party size tried.")
+
+    def handle(self, *args, **options):
+        package = Package.objects.order_by('pk').first()
+        if package is None:
+            raise CommandError("Need at least one package to attach the benchmark departure to.")
+        departure = Departure.objects.create(
+            package=package,
+            date=date.today() + timedelta(days=3650 + random.randint(0, 3650)),
+            capacity=options['capacity'],
+        )
+
+        latencies, sold, refused = [], [], []
+        lock = threading.Lock()
+        start = threading.Barrier(options['threads'])
+
+        def worker():
+            rng = random.Random()
+            mine = []
+            taken = rejected = 0
+            try:
+                start.wait()
+                for _ in range(options['attempts']):
+                    party = rng.randint(1, options['max_party'])
+                    began = time.perf_counter()
+                    if reserve_seats(departure.pk, party):
+                        taken += party
+                    else:
+                        rejected += 1
+                    mine.append(time.perf_counter() - began)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(mine)
+                sold.append(taken)
+                refused.append(rejected)
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        departure.refresh_from_db()
+        seats_sold = sum(sold)
+        departure.delete()
+
+        latencies.sort()
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        self.stdout.write(
+            f"{len(latencies)} reservations from {options['threads']} threads in {elapsed:.2f}s "
+            f"({len(latencies) / elapsed:.0f}/s); "
+            f"p50 {statistics.median(latencies) * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms"
+        )
+        self.stdout.write(f"Seats sold {seats_sold} of {options['capacity']}, "
+                          f"{sum(refused)} refused, {departure.seats_left} left in the row.")
+        if seats_sold + departure.seats_left != options['capacity']:
+            raise CommandError("Seat counts don't add up: the departure was oversold or lost seats.")
+        self.stdout.write(self.style.SUCCESS("No overselling."))
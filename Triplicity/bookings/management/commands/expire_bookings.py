@@ -0,0 +1,38 @@
+import signal
+import threading
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from bookings.reaper import expire_stale_bookings
+
+
+class Command(BaseCommand):
+    help = "Cancel bookings left pending (or failed) past a cutoff, releasing their seats."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=24 * 60,
+                            help="Minutes a booking may stay unsettled (default: 1440).")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=300)
+        parser.add_argument('--metrics-port', type=int,
+                            help="Serve Prometheus metrics on this port (useful with --loop).")
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'])
+        stop = threading.Event()
+        if options['loop']:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+
+        while True:
+            expired = expire_stale_bookings(
+                timedelta(minutes=options['older_than']), batch_size=options['batch_size'],
+            )
+            self.stdout.write(f"Cancelled {expired} stale booking(s).")
+            if not options['loop'] or stop.wait(options['interval']):
+                break
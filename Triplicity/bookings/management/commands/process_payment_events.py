@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from bookings.models import PaymentEvent
+from bookings.webhooks import process_event
+
+
+class Command(BaseCommand):
+    help = "Apply stored payment webhooks that were recorded but not processed."
+
+    def handle(self, *args, **options):
+        pending = list(
+            PaymentEvent.objects.filter(processed_at__isnull=True)
+            .order_by('received_at')
+            .values_list('event_id', flat=True)
+        )
+        processed = sum(1 for event_id in pending if process_event(event_id))
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} of {len(pending)} event(s)."))
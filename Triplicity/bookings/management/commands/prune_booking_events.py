@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bookings.models import BookingEvent
+
+
+class Command(BaseCommand):
+    help = "Delete booking event log entries older than a cutoff, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=365,
+                            help="Keep this many days of events (default: 365).")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        old = BookingEvent.objects.filter(created_at__lt=cutoff)
+        deleted = 0
+        # Short DELETEs, so vacuum keeps up and nothing waits on a long lock.
+        while True:
+            ids = list(old.values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += BookingEvent.objects.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} booking event(s) before {cutoff:%Y-%m-%d}."))
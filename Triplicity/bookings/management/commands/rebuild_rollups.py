@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from bookings.models import Booking
+from bookings.rollups import rebuild_day
+
+
+def _rebuild(day):
+    try:
+        rebuild_day(day)
+    finally:
+        connection.close()
+    return day
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily booking rollups for a date range, one day per task across "
+        "a thread pool. Live bookings keep updating the rollups while it runs, so prefer "
+        "closed days or a quiet period for recent ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day (YYYY-MM-DD); defaults to the first booking.")
+        parser.add_argument('--end', help="Last day (YYYY-MM-DD); defaults to today.")
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        end = parse_date(options['end']) if options['end'] else timezone.localdate()
+        if options['start']:
+            start = parse_date(options['start'])
+        else:
+            first = Booking.objects.aggregate(first=Min('created_at'))['first']
+            start = timezone.localdate(first) if first else end
+        if start is None or end is None:
+            raise CommandError("Dates must be YYYY-MM-DD.")
+        if start > end:
+            raise CommandError("--start is after --end.")
+
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        self.stdout.write(f"Rebuilding {len(days)} day(s) with {options['workers']} worker(s)...")
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for future in as_completed([pool.submit(_rebuild, day) for day in days]):
+                future.result()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups from {start} to {end}."))
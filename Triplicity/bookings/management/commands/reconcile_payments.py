@@ -0,0 +1,43 @@
+import signal
+import threading
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from bookings.reconcile import LOOKBACK, PAGE_SIZE, reconcile_payments
+
+
+class Command(BaseCommand):
+    help = "Mark bookings paid or failed from the gateway's PaymentIntents, for webhooks that never arrived."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookback', type=int, default=int(LOOKBACK.total_seconds() // 60),
+                            help="Minutes before the last checkpoint to re-read (default: 1440).")
+        parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, one pass every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=300)
+        parser.add_argument('--metrics-port', type=int,
+                            help="Serve Prometheus metrics on this port (useful with --loop).")
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'])
+        stop = threading.Event()
+        if options['loop']:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+
+        while True:
+            result = reconcile_payments(
+                lookback=timedelta(minutes=options['lookback']), page_size=options['page_size'],
+            )
+            self.stdout.write(
+                f"Checked {result.intents} intent(s): {result.paid} booking(s) paid, {result.failed} failed, "
+                f"{result.refunded} payment(s) for cancelled bookings refunded."
+            )
+            for pk, error in sorted(result.unrefunded.items()):
+                self.stderr.write(f"Booking {pk} is cancelled but its payment couldn't be refunded: {error}")
+            if not options['loop'] or stop.wait(options['interval']):
+                break
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.models import Booking
+from bookings.refunds import MAX_RETRIES, refund_bookings
+
+
+class Command(BaseCommand):
+    help = "Refund paid bookings and cancel unpaid ones, e.g. for a cancelled departure."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departure', type=int, help="Every booking on this departure.")
+        parser.add_argument('--booking', type=int, nargs='+', default=[], help="These booking ids.")
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help="Refund calls in flight at once (default: 8).")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-retries', type=int, default=MAX_RETRIES,
+                            help="Retries per booking after the gateway rate-limits us.")
+
+    def handle(self, *args, **options):
+        if not options['departure'] and not options['booking']:
+            raise CommandError("Pass --departure or --booking.")
+        bookings = Booking.objects.all()
+        if options['departure']:
+            bookings = bookings.filter(departure_id=options['departure'])
+        if options['booking']:
+            bookings = bookings.filter(pk__in=options['booking'])
+
+        result = refund_bookings(
+            bookings,
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            max_retries=options['max_retries'],
+        )
+        for pk, error in sorted(result.failed.items()):
+            self.stderr.write(f"Booking {pk}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Refunded {result.refunded}, cancelled {result.cancelled}, failed {len(result.failed)} booking(s)."
+        ))
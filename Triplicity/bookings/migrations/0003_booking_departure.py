@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0009_departures'),
+        ('bookings', '0002_payment_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='departure',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='packages.departure'),
+        ),
+    ]
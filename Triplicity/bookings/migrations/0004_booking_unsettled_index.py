@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_departure'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'failed'])), fields=['created_at'], name='booking_unsettled_created_idx'),
+        ),
+    ]
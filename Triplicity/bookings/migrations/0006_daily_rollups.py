@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0009_departures'),
+        ('bookings', '0005_booking_user_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPackageStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=10)),
+                ('bookings', models.IntegerField(default=0)),
+                ('persons', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='packages.package')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], max_length=10)),
+                ('bookings', models.IntegerField(default=0)),
+                ('persons', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='packages.category')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailypackagestats',
+            constraint=models.UniqueConstraint(fields=('date', 'package', 'status'), name='dailypackagestats_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorystats',
+            constraint=models.UniqueConstraint(fields=('date', 'category', 'status'), name='dailycategorystats_uniq'),
+        ),
+    ]
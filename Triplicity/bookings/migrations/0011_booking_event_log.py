@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_created_at_index(apps, schema_editor):
+    # Rows arrive in time order, so on PostgreSQL a BRIN index covers the
+    # time range scans (reports, pruning) at a tiny fraction of a B-tree's size.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX bookingevent_created_brin ON bookings_bookingevent USING BRIN (created_at)"
+        )
+    else:
+        schema_editor.execute(
+            "CREATE INDEX bookingevent_created_brin ON bookings_bookingevent (created_at)"
+        )
+
+
+def drop_created_at_index(apps, schema_editor):
+    schema_editor.execute("DROP INDEX IF EXISTS bookingevent_created_brin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_reconcile_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('created', 'Created'), ('intent_attached', 'Payment intent attached'), ('paid', 'Paid'), ('failed', 'Failed'), ('cancelled', 'Cancelled'), ('refunded', 'Refunded')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('booking', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='bookings.booking')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['booking', 'created_at'], name='bookingevent_booking_idx')],
+            },
+        ),
+        migrations.RunPython(create_created_at_index, drop_created_at_index),
+    ]
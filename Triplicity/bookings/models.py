@@ -3,7 +3,7 @@ from django.db import models
 # Create your models here.
 from django.db import models
 from django.conf import settings
-from packages.models import Package
+from packages.models import Category, Departure, Package
 
 class Booking(models.Model):
     STATUS_CHOICES = (
@@ -11,18 +11,139 @@ class Booking(models.Model):
         ('paid', 'Paid'),
         ('failed', 'Failed'),
         ('cancelled', 'Cancelled'),
+        ('refunded', 'Refunded'),
     )
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bookings')
     package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name='bookings')
+    departure = models.ForeignKey(Departure, on_delete=models.PROTECT, null=True, blank=True, related_name='bookings')
     person_count = models.PositiveIntegerField()
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
-    payment_intent_id = models.CharField(max_length=255, blank=True, null=True)
+    payment_intent_id = models.CharField(max_length=255, blank=True, null=True, db_index=True)
+    # From the booking form; the same submission can only ever create one booking.
+    idempotency_key = models.CharField(max_length=64, blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='booking_user_idempotency_uniq'),
+        ]
+        indexes = [
+            # Admin changelist: date_hierarchy and newest-first browsing.
+            models.Index(fields=['-created_at'], name='booking_created_idx'),
+            # Booking history: one user's bookings newest-first, keyset-paginated.
+            models.Index(fields=['user', '-created_at', '-id'], name='booking_user_created_idx'),
+            # Only unsettled bookings are indexed, so the reaper's scan stays
+            # small however large the paid history grows.
+            models.Index(
+                fields=['created_at'],
+                name='booking_unsettled_created_idx',
+                condition=models.Q(status__in=['pending', 'failed']),
+            ),
+        ]
+
     def __str__(self):
         return f"Booking #{self.id} - {self.user.email} - {self.package.title}"
 
     @property
     def booking_id(self):
         return self.id
+
+
+class BookingEvent(models.Model):
+    """
+    Append-only history of a booking's status, written in batches by
+    bookings.eventlog. Rows are never updated; `prune_booking_events`
+    deletes old ones.
+    """
+    EVENT_CHOICES = (
+        ('created', 'Created'),
+        ('intent_attached', 'Payment intent attached'),
+        ('paid', 'Paid'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+        ('refunded', 'Refunded'),
+    )
+    # No database constraint: the log is written after the booking's
+    # transaction commits and may outlive the booking.
+    booking = models.ForeignKey(
+        Booking, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='events',
+    )
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        # The created_at index (BRIN on PostgreSQL) is made in migration 0011.
+        indexes = [
+            models.Index(fields=['booking', 'created_at'], name='bookingevent_booking_idx'),
+        ]
+
+    def __str__(self):
+        return f"Booking {self.booking_id} {self.event} at {self.created_at}"
+
+
+class PaymentEvent(models.Model):
+    """A gateway webhook, stored before it is applied so none are lost."""
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payment_intent_id = models.CharField(max_length=255, blank=True, null=True)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['received_at'], name='paymentevent_received_idx'),
+            models.Index(
+                fields=['received_at'],
+                name='paymentevent_unprocessed_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} ({self.event_id})"
+
+
+class ReconcileCheckpoint(models.Model):
+    """How far `reconcile_payments` has compared gateway intents with bookings."""
+    name = models.SlugField(max_length=100, unique=True)
+    # Every intent created before this (less the lookback) has been checked.
+    reconciled_until = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} (until {self.reconciled_until})"
+
+
+class DailyPackageStats(models.Model):
+    """
+    Bookings made on one day for one package, per status. Kept current by
+    bookings.transitions; `rebuild_rollups` recomputes any range.
+    """
+    date = models.DateField()
+    package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=Booking.STATUS_CHOICES)
+    bookings = models.IntegerField(default=0)
+    persons = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'package', 'status'], name='dailypackagestats_uniq'),
+        ]
+
+
+class DailyCategoryStats(models.Model):
+    """The same totals per category (uncategorised packages only appear per package)."""
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=10, choices=Booking.STATUS_CHOICES)
+    bookings = models.IntegerField(default=0)
+    persons = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category', 'status'], name='dailycategorystats_uniq'),
+        ]
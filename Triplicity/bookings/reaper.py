@@ -0,0 +1,121 @@
+import asyncio
+from collections import Counter as Tally
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from prometheus_client import Counter, Gauge
+
+from .gateway import PaymentGatewayError, get_gateway
+from .inventory import release_booked_seats
+from .models import Booking
+from .transitions import transition_bookings
+
+# Bookings that never settled. `failed` ones still hold their seats (Stripe
+# allows a retry on the same PaymentIntent), so they are expired too.
+EXPIRABLE_STATUSES = ('pending', 'failed')
+
+# Gateway calls in flight at once while cancelling a batch's intents.
+CANCEL_CONCURRENCY = 8
+
+bookings_expired = Counter(
+    'triplicity_bookings_expired', 'Unsettled bookings cancelled by the reaper.', ['previous_status'],
+)
+bookings_kept = Counter(
+    'triplicity_bookings_expiry_skipped', "Stale bookings left alone because their intent couldn't be cancelled.",
+)
+seats_released = Counter('triplicity_booking_seats_released', 'Seats returned by expired bookings.')
+last_run = Gauge('triplicity_booking_reaper_last_run_timestamp_seconds', 'When the reaper last finished a pass.')
+
+
+async def _close_intent(gateway, semaphore, intent_id):
+    async with semaphore:
+        try:
+            await gateway.cancel_intent(intent_id)
+            return True
+        except PaymentGatewayError:
+            # Already cancelled is fine; succeeded (or unreachable) is not.
+            try:
+                intent = await gateway.retrieve_intent(intent_id)
+            except PaymentGatewayError:
+                return False
+            return intent.status == 'canceled'
+
+
+async def _close_intents(intent_ids, concurrency):
+    gateway = get_gateway()
+    semaphore = asyncio.Semaphore(concurrency)
+    closed = await asyncio.gather(*(_close_intent(gateway, semaphore, intent_id) for intent_id in intent_ids))
+    return {intent_id for intent_id, ok in zip(intent_ids, closed) if ok}
+
+
+def close_intents(candidates, concurrency=CANCEL_CONCURRENCY):
+    """
+    Cancel the PaymentIntents of bookings about to be cancelled, so a
+    customer still on the payment page can't pay for a booking (and seats)
+    that no longer exist.
+
+    ``candidates`` are (booking_id, payment_intent_id) pairs. Returns the
+    booking ids that are safe to cancel: those without an intent and those
+    whose intent is now cancelled. A booking whose payment already went
+    through is left for the webhook (or reconciliation) to mark paid.
+    """
+    intent_ids = [intent_id for _, intent_id in candidates if intent_id]
+    closed = async_to_sync(_close_intents)(intent_ids, concurrency) if intent_ids else set()
+    return [pk for pk, intent_id in candidates if not intent_id or intent_id in closed]
+
+
+def expire_batch(cutoff, batch_size, after=None):
+    """
+    Cancel up to ``batch_size`` unsettled bookings created before ``cutoff``,
+    continuing after the ``(created_at, pk)`` cursor ``after``.
+
+    Their intents are cancelled at the gateway first, and only bookings whose
+    intent is closed are expired. One short transaction per batch: rows are
+    locked with SKIP LOCKED, so a webhook updating one of them is never
+    waited on (it is picked up next time), and seats are released in the
+    same transaction as the cancel.
+
+    Returns (cancelled, cursor); the cursor is None once nothing is left.
+    """
+    stale = Booking.objects.filter(created_at__lt=cutoff, status__in=EXPIRABLE_STATUSES)
+    if after is not None:
+        stale = stale.filter(Q(created_at__gt=after[0]) | Q(created_at=after[0], pk__gt=after[1]))
+    candidates = list(stale.order_by('created_at', 'pk').values_list('created_at', 'pk', 'payment_intent_id')[:batch_size])
+    if not candidates:
+        return 0, None
+    cursor = candidates[-1][:2]
+    closable = close_intents([(pk, intent_id) for _, pk, intent_id in candidates])
+    bookings_kept.inc(len(candidates) - len(closable))
+    if not closable:
+        return 0, cursor
+
+    with transaction.atomic():
+        rows = transition_bookings(
+            Booking.objects.filter(pk__in=closable, created_at__lt=cutoff),
+            'cancelled', EXPIRABLE_STATUSES, skip_locked=True,
+        )
+        if not rows:
+            return 0, cursor
+        released = release_booked_seats(rows)
+
+    for status, count in Tally(row.status for row in rows).items():
+        bookings_expired.labels(status).inc(count)
+    seats_released.inc(released)
+    return len(rows), cursor
+
+
+def expire_stale_bookings(older_than, batch_size=500, max_batches=None):
+    """Run batches until nothing stale is left (or ``max_batches``). Returns the total cancelled."""
+    cutoff = timezone.now() - older_than
+    total = batches = 0
+    cursor = None
+    while max_batches is None or batches < max_batches:
+        expired, cursor = expire_batch(cutoff, batch_size, cursor)
+        total += expired
+        batches += 1
+        if cursor is None:
+            break
+    last_run.set_to_current_time()
+    return total
@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from django.utils import timezone
+from prometheus_client import Counter, Gauge
+
+from .gateway import get_gateway
+from .models import Booking, ReconcileCheckpoint
+from .refunds import mark_refunded, refund_payments
+from .webhooks import mark_failed, mark_paid
+
+# Intents keep changing after they're created (a customer can pay minutes
+# later), so each pass re-reads this far behind the checkpoint. Pending
+# bookings older than a day are cancelled by the reaper anyway.
+LOOKBACK = timedelta(hours=24)
+PAGE_SIZE = 100
+CHECKPOINT = 'payment_intents'
+
+# Intent statuses that settle a booking, as the matching webhooks would.
+PAID_STATUSES = {'succeeded'}
+FAILED_STATUSES = {'canceled'}
+
+bookings_reconciled = Counter(
+    'triplicity_bookings_reconciled', 'Bookings settled by reconciliation instead of a webhook.', ['status'],
+)
+orphaned_payments = Counter(
+    'triplicity_orphaned_payments', 'Succeeded payments found for cancelled bookings, by outcome.', ['result'],
+)
+last_run = Gauge('triplicity_payment_reconcile_last_run_timestamp_seconds', 'When reconciliation last finished a pass.')
+
+
+@dataclass
+class ReconcileResult:
+    intents: int = 0
+    paid: int = 0
+    failed: int = 0
+    # Money taken for bookings that were already cancelled: refunded, or
+    # {booking id: error} when the refund didn't go through.
+    refunded: int = 0
+    unrefunded: dict = field(default_factory=dict)
+
+
+def _apply_page(intents):
+    """
+    Settle every booking one page of intents accounts for: two bulk UPDATEs
+    at most. Also returns the (booking id, intent id) pairs of succeeded
+    intents whose booking had already been cancelled.
+    """
+    paid_ids = [intent.id for intent in intents if intent.status in PAID_STATUSES]
+    failed_ids = [intent.id for intent in intents if intent.status in FAILED_STATUSES]
+    with transaction.atomic():
+        paid = mark_paid(paid_ids) if paid_ids else 0
+        failed = mark_failed(failed_ids) if failed_ids else 0
+    orphans = list(
+        Booking.objects.filter(payment_intent_id__in=paid_ids, status='cancelled')
+        .values_list('pk', 'payment_intent_id')
+    ) if paid_ids else []
+    return paid, failed, orphans
+
+
+async def _refund_orphans(orphans, result):
+    # The seats were released (and maybe resold) when the booking was
+    # cancelled, so the payment goes back rather than reviving the booking.
+    errors = await refund_payments(orphans)
+    done = [pk for pk, error in errors.items() if error is None]
+    if done:
+        result.refunded += await sync_to_async(mark_refunded)(done, ('cancelled',))
+    result.unrefunded.update({pk: error for pk, error in errors.items() if error is not None})
+
+
+async def _reconcile(name, lookback, page_size):
+    checkpoint, _ = await ReconcileCheckpoint.objects.aget_or_create(name=name)
+    window_end = timezone.now()
+    since = (checkpoint.reconciled_until or window_end) - lookback
+    gateway = get_gateway()
+    result = ReconcileResult()
+    starting_after = None
+    while True:
+        page = await gateway.list_intents(since, starting_after=starting_after, limit=page_size)
+        result.intents += len(page.intents)
+        paid, failed, orphans = await sync_to_async(_apply_page)(page.intents)
+        result.paid += paid
+        result.failed += failed
+        if orphans:
+            await _refund_orphans(orphans, result)
+        if not page.has_more or not page.intents:
+            break
+        starting_after = page.intents[-1].id
+
+    # Only a complete pass moves the checkpoint; an interrupted one is redone.
+    checkpoint.reconciled_until = window_end
+    await checkpoint.asave(update_fields=['reconciled_until', 'updated_at'])
+    return result
+
+
+def reconcile_payments(lookback=LOOKBACK, page_size=PAGE_SIZE, name=CHECKPOINT):
+    """
+    Settle bookings whose webhook never arrived, from the gateway's own list
+    of PaymentIntents.
+
+    The gateway is called once per page of ``page_size`` intents, and each
+    page is matched to bookings by the indexed ``payment_intent_id`` in bulk.
+    Transitions are the webhook's own conditional UPDATEs, so running this
+    alongside webhooks (or twice) can't move a booking twice. Payments that
+    succeeded for bookings already cancelled are refunded, keyed per
+    booking like any other refund.
+    """
+    result = async_to_sync(_reconcile)(name, lookback, page_size)
+    bookings_reconciled.labels('paid').inc(result.paid)
+    bookings_reconciled.labels('failed').inc(result.failed)
+    orphaned_payments.labels('refunded').inc(result.refunded)
+    orphaned_payments.labels('unrefunded').inc(len(result.unrefunded))
+    last_run.set_to_current_time()
+    return result
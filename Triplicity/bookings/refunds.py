@@ -0,0 +1,153 @@
+import asyncio
+import random
+from dataclasses import dataclass, field
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import transaction
+from prometheus_client import Counter
+
+from .gateway import PaymentGatewayError, RateLimited, get_gateway
+from .inventory import release_booked_seats
+from .models import Booking
+from .reaper import EXPIRABLE_STATUSES, close_intents
+from .transitions import transition_bookings
+
+REFUNDABLE_STATUSES = ('paid',)
+
+# Retries after RateLimited: ~0.5s, 1s, 2s, 4s, then 8s apart, with jitter.
+RETRY_BASE = 0.5
+RETRY_MAX = 8
+MAX_RETRIES = 6
+
+# Bookings per queued refund job. Even with every refund backing off to the
+# limit, one job stays well inside run_workers' default --stale-after.
+JOB_SIZE = 50
+
+refund_calls = Counter('triplicity_booking_refunds', 'Booking refund attempts by outcome.', ['result'])
+refund_retries = Counter('triplicity_booking_refund_retries', 'Refund calls retried after a rate limit.')
+
+
+@dataclass
+class RefundResult:
+    refunded: int = 0
+    cancelled: int = 0
+    failed: dict = field(default_factory=dict)  # booking id -> gateway error
+
+
+def refund_key(booking_id):
+    # Stable per booking: a re-run after a crash gets the first refund back
+    # from the gateway instead of refunding twice.
+    return f'refund-booking-{booking_id}'
+
+
+def retry_delay(attempt):
+    return min(RETRY_BASE * 2 ** (attempt - 1), RETRY_MAX) * random.uniform(0.8, 1.2)
+
+
+async def _refund_one(gateway, semaphore, booking_id, payment_intent_id, max_retries):
+    """Refund one booking's payment; returns None, or the error that stopped it."""
+    if not payment_intent_id:
+        return "No payment to refund"
+    attempt = 0
+    while True:
+        async with semaphore:
+            try:
+                await gateway.refund(payment_intent_id, idempotency_key=refund_key(booking_id))
+                refund_calls.labels('refunded').inc()
+                return None
+            except RateLimited as exc:
+                if attempt >= max_retries:
+                    refund_calls.labels('rate_limited').inc()
+                    return str(exc)
+            except PaymentGatewayError as exc:
+                refund_calls.labels('failed').inc()
+                return str(exc)
+        # Back off outside the semaphore so other refunds keep their slots.
+        attempt += 1
+        refund_retries.inc()
+        await asyncio.sleep(retry_delay(attempt))
+
+
+def _next_batch(bookings, after_pk, batch_size):
+    return list(
+        bookings.filter(status__in=REFUNDABLE_STATUSES, pk__gt=after_pk)
+        .order_by('pk').values_list('pk', 'payment_intent_id')[:batch_size]
+    )
+
+
+def mark_refunded(booking_ids, from_statuses=REFUNDABLE_STATUSES):
+    """
+    Move refunded bookings to 'refunded' in one conditional UPDATE, giving
+    back the seats of those that still held any in the same transaction.
+    """
+    with transaction.atomic():
+        rows = transition_bookings(Booking.objects.filter(pk__in=booking_ids), 'refunded', from_statuses)
+        release_booked_seats(row for row in rows if row.status != 'cancelled')
+    return len(rows)
+
+
+async def refund_payments(pairs, concurrency=8, max_retries=MAX_RETRIES):
+    """
+    Refund ``(booking_id, payment_intent_id)`` pairs, up to ``concurrency``
+    at once. Returns {booking_id: None, or the error that stopped it}.
+    """
+    gateway = get_gateway()
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = await asyncio.gather(*(
+        _refund_one(gateway, semaphore, pk, payment_intent_id, max_retries)
+        for pk, payment_intent_id in pairs
+    ))
+    return {pk: error for (pk, _), error in zip(pairs, errors)}
+
+
+async def _refund_paid(bookings, concurrency, batch_size, max_retries):
+    result = RefundResult()
+    after_pk = 0
+    while True:
+        batch = await sync_to_async(_next_batch)(bookings, after_pk, batch_size)
+        if not batch:
+            return result
+        after_pk = batch[-1][0]
+        errors = await refund_payments(batch, concurrency, max_retries)
+        done = []
+        for pk, error in errors.items():
+            if error is None:
+                done.append(pk)
+            else:
+                result.failed[pk] = error
+        if done:
+            result.refunded += await sync_to_async(mark_refunded)(done)
+
+
+def cancel_unpaid(bookings, result):
+    """
+    Cancel the pending/failed bookings in ``bookings`` and release their
+    seats, once their PaymentIntents are cancelled at the gateway.
+    """
+    candidates = list(bookings.filter(status__in=EXPIRABLE_STATUSES).values_list('pk', 'payment_intent_id'))
+    closable = set(close_intents(candidates))
+    for pk, _ in candidates:
+        if pk not in closable:
+            # Most likely paid meanwhile: the webhook marks it paid, and
+            # running the refund again then refunds it.
+            result.failed[pk] = "Payment couldn't be cancelled; run again once it settles"
+    with transaction.atomic():
+        rows = transition_bookings(bookings.filter(pk__in=closable), 'cancelled', EXPIRABLE_STATUSES)
+        release_booked_seats(rows)
+    result.cancelled += len(rows)
+
+
+def refund_bookings(bookings, concurrency=8, batch_size=100, max_retries=MAX_RETRIES):
+    """
+    Refund every paid booking in ``bookings`` (a queryset) and cancel the
+    unpaid ones along with their PaymentIntents, e.g. when a departure is
+    called off.
+
+    Up to ``concurrency`` refund calls are in flight at once. Each batch's
+    successful refunds are marked in one UPDATE before the next batch
+    starts, so an interrupted run can simply be repeated: refunded bookings
+    are skipped and per-booking idempotency keys cover the rest.
+    """
+    result = async_to_sync(_refund_paid)(bookings, concurrency, batch_size, max_retries)
+    cancel_unpaid(bookings, result)
+    return result
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Booking, DailyCategoryStats, DailyPackageStats
+
+
+def _bump(model, keys, bookings, persons, revenue):
+    """Add to one rollup row, creating it on first use."""
+    changes = {
+        'bookings': F('bookings') + bookings,
+        'persons': F('persons') + persons,
+        'revenue': F('revenue') + revenue,
+    }
+    if model.objects.filter(**keys).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, bookings=bookings, persons=persons, revenue=revenue)
+    except IntegrityError:
+        # Another transaction created it first.
+        model.objects.filter(**keys).update(**changes)
+
+
+def apply(changes):
+    """
+    Fold status changes into the daily rollups.
+
+    ``changes`` is an iterable of (row, old_status, new_status); ``row``
+    needs created_at, package_id, category_id, person_count and
+    total_amount, and ``old_status`` is None for a new booking. Bookings
+    stay on the day they were made, moving between status rows.
+    """
+    deltas = defaultdict(lambda: [0, 0, Decimal(0)])
+    for row, old_status, new_status in changes:
+        day = timezone.localdate(row.created_at)
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            if status is None:
+                continue
+            delta = deltas[day, row.package_id, row.category_id, status]
+            delta[0] += sign
+            delta[1] += sign * row.person_count
+            delta[2] += sign * Decimal(row.total_amount)
+
+    # Sorted so concurrent transactions take row locks in the same order.
+    for (day, package_id, category_id, status), (bookings, persons, revenue) in sorted(deltas.items()):
+        _bump(DailyPackageStats, {'date': day, 'package_id': package_id, 'status': status},
+              bookings, persons, revenue)
+        if category_id:
+            _bump(DailyCategoryStats, {'date': day, 'category_id': category_id, 'status': status},
+                  bookings, persons, revenue)
+
+
+def rebuild_day(day):
+    """Recompute one day's rollups from the bookings table."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    bookings = Booking.objects.filter(created_at__gte=start, created_at__lt=end)
+    totals = dict(bookings=Count('pk'), persons=Sum('person_count'), revenue=Sum('total_amount'))
+
+    with transaction.atomic():
+        DailyPackageStats.objects.filter(date=day).delete()
+        DailyCategoryStats.objects.filter(date=day).delete()
+        DailyPackageStats.objects.bulk_create([
+            DailyPackageStats(date=day, **row)
+            for row in bookings.values('package_id', 'status').annotate(**totals).order_by()
+        ])
+        DailyCategoryStats.objects.bulk_create([
+            DailyCategoryStats(date=day, category_id=row.pop('package__category_id'), **row)
+            for row in bookings.filter(package__category__isnull=False)
+            .values('package__category_id', 'status').annotate(**totals).order_by()
+        ])
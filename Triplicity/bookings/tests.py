@@ -1,3 +1,216 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobqueue.models import Job
+from packages.models import Departure, Package
+
+from . import idempotency
+from .gateway import PaymentGatewayError, get_gateway
+from .inventory import release_seats, reserve_seats
+from .models import Booking, PaymentEvent
+from .reaper import expire_stale_bookings
+
+
+@override_settings(PAYMENT_GATEWAY='fake', STRIPE_WEBHOOK_SECRET='whsec_test')
+class CheckoutTestCase(TestCase):
+    """A signed-in customer, one package with one departure, and a FakeGateway."""
+
+    def setUp(self):
+        get_gateway.cache_clear()
+        self.addCleanup(get_gateway.cache_clear)
+        cache.clear()
+        self.gateway = get_gateway()
+        self.user = get_user_model().objects.create_user('traveller', 'traveller@example.com', 'secret')
+        self.package = Package.objects.create(
+            title='Kerala Backwaters', slug='kerala-backwaters', price=1000, duration='4 Days / 3 Nights',
+        )
+        self.departure = Departure.objects.create(
+            package=self.package, date=timezone.localdate() + timedelta(days=30), capacity=10,
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('bookings:create_booking', args=[self.package.slug])
+
+    def post(self, key='a' * 32, person_count=2):
+        return self.client.post(self.url, {
+            'departure': self.departure.pk,
+            'person_count': person_count,
+            'idempotency_key': key,
+        })
+
+    def seats_left(self):
+        self.departure.refresh_from_db()
+        return self.departure.seats_left
+
+
+class CheckoutTests(CheckoutTestCase):
+    def test_checkout_holds_seats_and_starts_payment(self):
+        response = self.post(person_count=2)
+
+        self.assertTemplateUsed(response, 'bookings/booking_payment.html')
+        booking = Booking.objects.get()
+        self.assertEqual(booking.status, 'pending')
+        self.assertEqual(booking.total_amount, 2000)
+        intent = self.gateway.intents[booking.payment_intent_id]
+        self.assertEqual(intent.amount, 200000)
+        self.assertEqual(response.context['client_secret'], intent.client_secret)
+        self.assertEqual(self.seats_left(), 8)
+
+    def test_gateway_error_gives_seats_back(self):
+        with mock.patch.object(self.gateway, 'create_intent', side_effect=PaymentGatewayError("down")):
+            response = self.post(person_count=2)
+
+        self.assertTemplateUsed(response, 'bookings/booking_form.html')
+        self.assertContains(response, "We couldn&#x27;t start the payment")
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(self.seats_left(), 10)
+
+
+class IdempotentCheckoutTests(CheckoutTestCase):
+    def test_repeated_post_returns_the_same_booking(self):
+        first = self.post(key='c' * 32, person_count=2)
+        second = self.post(key='c' * 32, person_count=2)
+
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(first.context['booking'].pk, second.context['booking'].pk)
+        self.assertEqual(first.context['client_secret'], second.context['client_secret'])
+        self.assertEqual(len(self.gateway.intents), 1)
+        self.assertEqual(self.seats_left(), 8)
+
+    def test_repeat_after_the_cached_result_expired_finds_the_booking(self):
+        first = self.post(key='c' * 32, person_count=2)
+        cache.clear()
+        second = self.post(key='c' * 32, person_count=2)
+
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(first.context['booking'].pk, second.context['booking'].pk)
+        self.assertEqual(self.seats_left(), 8)
+
+    def test_repeat_of_a_failed_attempt_gets_a_fresh_key(self):
+        with mock.patch.object(self.gateway, 'create_intent', side_effect=PaymentGatewayError("down")):
+            failed = self.post(key='d' * 32)
+        retry = self.post(key='d' * 32)
+
+        self.assertContains(retry, "That booking didn&#x27;t go through")
+        self.assertFalse(Booking.objects.exists())
+        fresh_keys = {response.context['form']['idempotency_key'].value() for response in (failed, retry)}
+        self.assertNotIn('d' * 32, fresh_keys)
+
+        self.post(key=fresh_keys.pop())
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(self.seats_left(), 8)
+
+    def test_repeat_while_the_first_attempt_runs_is_sent_to_my_bookings(self):
+        self.assertTrue(async_to_sync(idempotency.claim)(self.user.pk, 'e' * 32))
+
+        with mock.patch.object(idempotency, 'WAIT_TIMEOUT', 0):
+            response = self.post(key='e' * 32)
+
+        self.assertRedirects(response, reverse('bookings:my_bookings'))
+        self.assertFalse(Booking.objects.exists())
+
+
+class SeatTests(CheckoutTestCase):
+    def test_reserve_never_oversells(self):
+        self.assertTrue(reserve_seats(self.departure.pk, 8))
+        self.assertFalse(reserve_seats(self.departure.pk, 3))
+        self.assertEqual(self.seats_left(), 2)
+        self.assertTrue(reserve_seats(self.departure.pk, 2))
+        self.assertFalse(reserve_seats(self.departure.pk, 1))
+        self.assertEqual(self.seats_left(), 0)
+
+    def test_release_stops_at_capacity(self):
+        reserve_seats(self.departure.pk, 4)
+        release_seats(self.departure.pk, 4)
+        release_seats(self.departure.pk, 4)
+        self.assertEqual(self.seats_left(), 10)
+
+    def test_checkout_refuses_seats_taken_meanwhile(self):
+        # The form saw 10 seats; someone else takes 9 before the reservation.
+        with mock.patch('bookings.views.reserve_seats', side_effect=lambda pk, count: (
+            reserve_seats(pk, 9) and reserve_seats(pk, count)
+        )):
+            response = self.post(person_count=2)
+
+        self.assertContains(response, "those seats were just taken")
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(self.seats_left(), 1)
+
+
+class WebhookTests(CheckoutTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post()
+        self.booking = Booking.objects.get()
+        self.webhook_url = reverse('bookings:payment_webhook')
+
+    def deliver(self, payload, signature):
+        return self.client.post(
+            self.webhook_url, payload, content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+        )
+
+    def test_replayed_event_is_applied_once(self):
+        self.gateway.set_status(self.booking.payment_intent_id, 'succeeded')
+        payload, signature = self.gateway.sign_event(
+            'evt_paid', 'payment_intent.succeeded', self.booking.payment_intent_id,
+        )
+
+        self.assertEqual(self.deliver(payload, signature).status_code, 200)
+        self.assertEqual(self.deliver(payload, signature).status_code, 200)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'paid')
+        event = PaymentEvent.objects.get()
+        self.assertEqual(event.event_id, 'evt_paid')
+        self.assertIsNotNone(event.processed_at)
+        # One confirmation email, not one per delivery.
+        self.assertEqual(Job.objects.filter(name='bookings.send_booking_mail').count(), 1)
+
+    def test_bad_signature_is_rejected(self):
+        payload, _ = self.gateway.sign_event('evt_paid', 'payment_intent.succeeded', self.booking.payment_intent_id)
+
+        response = self.deliver(payload, 't=1,v1=forged')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+
+class ReaperTests(CheckoutTestCase):
+    def checkout(self, key, person_count):
+        self.post(key=key, person_count=person_count)
+        booking = Booking.objects.get(idempotency_key=key)
+        Booking.objects.filter(pk=booking.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        return booking
+
+    def test_abandoned_booking_is_cancelled_and_its_seats_released(self):
+        booking = self.checkout('a' * 32, person_count=3)
+        self.assertEqual(self.seats_left(), 7)
+
+        self.assertEqual(expire_stale_bookings(timedelta(hours=1)), 1)
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'cancelled')
+        self.assertEqual(self.gateway.intents[booking.payment_intent_id].status, 'canceled')
+        self.assertEqual(self.seats_left(), 10)
+
+    def test_booking_paid_meanwhile_is_kept(self):
+        booking = self.checkout('b' * 32, person_count=3)
+        self.gateway.set_status(booking.payment_intent_id, 'succeeded')
+
+        self.assertEqual(expire_stale_bookings(timedelta(hours=1)), 0)
+
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'pending')
+        self.assertEqual(self.seats_left(), 7)
+
+    def test_recent_booking_is_left_alone(self):
+        self.post(person_count=3)
+
+        self.assertEqual(expire_stale_bookings(timedelta(hours=1)), 0)
+        self.assertEqual(self.seats_left(), 7)
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models import F
+
+from . import eventlog, rollups
+from .models import Booking
+
+# What rollups.apply needs to know about each booking that moves.
+ROW_FIELDS = ('pk', 'status', 'created_at', 'package_id', 'category_id',
+              'departure_id', 'person_count', 'total_amount')
+
+
+def new_booking(**fields):
+    """Insert a booking and count it in the rollups, atomically."""
+    with transaction.atomic():
+        booking = Booking.objects.create(**fields)
+        booking.category_id = booking.package.category_id
+        rollups.apply([(booking, None, booking.status)])
+        events = [(booking.pk, 'created')]
+        if booking.payment_intent_id:
+            events.append((booking.pk, 'intent_attached'))
+        transaction.on_commit(lambda: eventlog.record(events))
+    return booking
+
+
+def transition_bookings(bookings, to_status, from_statuses, limit=None, skip_locked=False):
+    """
+    Move the bookings in ``bookings`` (a queryset) that are currently in one
+    of ``from_statuses`` to ``to_status``, and update the rollups to match.
+
+    The rows are locked first and the UPDATE is still conditional on their
+    status, so concurrent callers can't move a booking twice. Returns the
+    moved rows (with their previous status), for seat releases and emails.
+    """
+    with transaction.atomic():
+        locked = bookings.filter(status__in=from_statuses).select_for_update(
+            skip_locked=skip_locked, of=('self',),
+        ).annotate(category_id=F('package__category_id'))
+        rows = list(locked.values_list(*ROW_FIELDS, named=True)[:limit])
+        if not rows:
+            return []
+        Booking.objects.filter(pk__in=[row.pk for row in rows], status__in=from_statuses).update(status=to_status)
+        rollups.apply((row, row.status, to_status) for row in rows)
+        transaction.on_commit(lambda: eventlog.record((row.pk, to_status) for row in rows))
+    return rows
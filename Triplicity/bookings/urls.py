@@ -6,5 +6,8 @@ app_name = 'bookings'
 urlpatterns = [
     path('book/<slug:package_slug>/', views.create_booking, name='create_booking'),
     path('payment-complete/', views.payment_complete, name='payment_complete'),
+    path('webhooks/stripe/', views.payment_webhook, name='payment_webhook'),
     path('my-bookings/', views.my_bookings, name='my_bookings'),
+    path('dashboard/revenue/', views.revenue_dashboard, name='revenue_dashboard'),
+    path('export/', views.export_bookings, name='export'),
 ]
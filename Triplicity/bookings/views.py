@@ -2,118 +2,294 @@ from django.shortcuts import render
 
 # Create your views here.
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+import uuid
+from datetime import timedelta
+from django.db import IntegrityError
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from asgiref.sync import sync_to_async
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.conf import settings
 from django.contrib import messages
+from packages import pricing
 from packages.models import Package
-from .models import Booking
+from packages.pagination import keyset_paginate
+from .models import Booking, DailyCategoryStats, DailyPackageStats
 from .forms import BookingForm
-from django.core.mail import send_mail
-import stripe
-import threading
+from . import idempotency
+from .exports import aiter_sync, csv_chunks, export_queryset, iter_rows
+from .inventory import release_seats, reserve_seats
+from .transitions import new_booking
+from .gateway import InvalidWebhook, PaymentGatewayError, get_gateway
+from .webhooks import process_event, record_event
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+BOOKINGS_PAGE_SIZE = 20
 
-def send_booking_mail_async(user, booking):
-    """Send booking confirmation email asynchronously"""
-    thread = threading.Thread(target=send_booking_mail, args=(user, booking))
-    thread.start()
+async def create_booking(request, package_slug):
+    # Async so the worker is free while the payment gateway responds; the
+    # booking row is written once, with its PaymentIntent already attached.
+    # Resolving request.user reads the session and users tables.
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return redirect_to_login(request.get_full_path())
+    user = request.user
+    try:
+        package = await Package.objects.aget(slug=package_slug)
+    except Package.DoesNotExist:
+        raise Http404("No Package matches the given query.")
 
-@login_required
-def create_booking(request, package_slug):
-    package = get_object_or_404(Package, slug=package_slug)
     if request.method == "POST":
-        form = BookingForm(request.POST)
-        if form.is_valid():
-            person_count = form.cleaned_data['person_count']
-            total_amount = float(pkg_price(package)) * int(person_count)
-            # Create booking with pending status
-            booking = Booking.objects.create(
-                user=request.user,
-                package=package,
-                person_count=person_count,
-                total_amount=total_amount,
-                status='pending'
-            )
-            # Create Stripe PaymentIntent
-            intent = stripe.PaymentIntent.create(
-                amount=int(total_amount * 100),  # Stripe expects paise/cents
-                currency="inr",  # or "usd"
-                metadata={'booking_id': booking.id, 'user_id': request.user.id},
-                description=f"Booking Triplicity: {package.title} for {person_count}x person",
-            )
-            booking.payment_intent_id = intent['id']
-            booking.save()
-            return render(request, 'bookings/booking_payment.html', {
-                'package': package,
-                'booking': booking,
-                'client_secret': intent['client_secret'],
-                'stripe_public_key': settings.STRIPE_PUBLIC_KEY,
-            })
+        # A repeated submission of the same form (double-click, browser
+        # retry) gets the first one's booking back without writing or
+        # calling the gateway again.
+        key = request.POST.get('idempotency_key')
+        if idempotency.is_valid(key):
+            done = await idempotency.result(user.pk, key)
+            if done is None and not await idempotency.claim(user.pk, key):
+                done = await idempotency.wait_for_result(user.pk, key)
+                if done is None:
+                    messages.info(request, "That booking is still being set up. You'll find it under My Bookings.")
+                    return redirect('bookings:my_bookings')
+                if done == idempotency.FAILED:
+                    messages.error(request, "That booking didn't go through. Please check the details and try again.")
+                    form = await sync_to_async(_booking_form)(package, request.POST)
+                    form.renew_key()
+                    return await _booking_page(request, package, form)
+            if done is not None:
+                return await _payment_page(request, package, done['booking_id'], done['client_secret'])
+
+        form = await sync_to_async(_booking_form)(package, request.POST)
+        response = None
+        try:
+            if form.is_valid():
+                response = await _checkout(request, user, package, form)
+        finally:
+            if response is None and idempotency.is_valid(key):
+                await idempotency.fail(user.pk, key)
+        if response is not None:
+            return response
+        # Submitting the form again is a new attempt, not a repeat of this one.
+        form.renew_key()
     else:
-        form = BookingForm()
-    return render(request, 'bookings/booking_form.html', {'package': package, 'form': form})
+        form = await sync_to_async(_booking_form)(package)
+    return await _booking_page(request, package, form)
+
+async def _booking_page(request, package, form):
+    # The per-person price shown is the pricing engine's, not the base price.
+    await sync_to_async(pricing.attach_from_prices)([package])
+    return await sync_to_async(render)(request, 'bookings/booking_form.html', {'package': package, 'form': form})
+
+async def _checkout(request, user, package, form):
+    """Reserve seats, start the payment and write the booking; None if the form should be shown again."""
+    key = form.cleaned_data['idempotency_key']
+    person_count = form.cleaned_data['person_count']
+    departure = form.cleaned_data.get('departure')
+
+    # The cached result may have expired while the booking itself exists.
+    existing = await Booking.objects.filter(user=user, idempotency_key=key).afirst()
+    if existing is not None:
+        return await _resume_checkout(request, package, existing, key)
+
+    # Exact Decimal/paise quote from the package's compiled price rules.
+    quote = await sync_to_async(pricing.quote)(
+        package, adults=person_count, day=departure.date if departure else None,
+    )
+    # Seats are held before the payment starts; the booking gives them
+    # back if it's cancelled or the payment fails.
+    if departure and not await sync_to_async(reserve_seats)(departure.pk, person_count):
+        form.add_error('person_count', "Sorry, those seats were just taken. Please pick fewer persons or another date.")
+        return None
+    try:
+        intent = await get_gateway().create_intent(
+            amount=quote.total_minor,  # Stripe expects paise/cents
+            currency=quote.currency,
+            metadata={'user_id': user.id, 'package_id': package.id},
+            description=f"Booking Triplicity: {package.title} for {person_count}x person",
+            # Keyed on the amount too: the gateway rejects a key reused with different parameters.
+            idempotency_key=f'booking-{user.pk}-{key}-{quote.total_minor}',
+        )
+    except PaymentGatewayError:
+        if departure:
+            await sync_to_async(release_seats)(departure.pk, person_count)
+        messages.error(request, "We couldn't start the payment. Please try again in a moment.")
+        return None
+
+    try:
+        # Create booking with pending status
+        booking = await sync_to_async(new_booking)(
+            user=user,
+            package=package,
+            departure=departure,
+            person_count=person_count,
+            total_amount=quote.total,
+            status='pending',
+            payment_intent_id=intent.id,
+            idempotency_key=key,
+        )
+    except IntegrityError:
+        # Another request with this key won the race past the cache.
+        if departure:
+            await sync_to_async(release_seats)(departure.pk, person_count)
+        existing = await Booking.objects.aget(user=user, idempotency_key=key)
+        return await _resume_checkout(request, package, existing, key)
+    except Exception:
+        # No booking holds the seats, so nothing else would give them back.
+        if departure:
+            await sync_to_async(release_seats)(departure.pk, person_count)
+        raise
+
+    await idempotency.remember(user.pk, key, booking.pk, intent.client_secret)
+    return await _payment_page(request, package, booking, intent.client_secret)
+
+async def _resume_checkout(request, package, booking, key):
+    try:
+        intent = await get_gateway().retrieve_intent(booking.payment_intent_id)
+    except PaymentGatewayError:
+        messages.error(request, "We couldn't load your payment. Please try again in a moment.")
+        return None
+    await idempotency.remember(booking.user_id, key, booking.pk, intent.client_secret)
+    return await _payment_page(request, package, booking, intent.client_secret)
+
+async def _payment_page(request, package, booking, client_secret):
+    if not isinstance(booking, Booking):
+        booking = await Booking.objects.select_related('departure').aget(pk=booking)
+    return await sync_to_async(render)(request, 'bookings/booking_payment.html', {
+        'package': package,
+        'booking': booking,
+        'client_secret': client_secret,
+        'stripe_public_key': settings.STRIPE_PUBLIC_KEY,
+    })
 
-def pkg_price(package):
-    # always returns per person price as float
-    return float(package.price)
+def _booking_form(package, data=None):
+    # Building and validating the form queries departures, so it runs in a thread.
+    if data is not None and not idempotency.is_valid(data.get('idempotency_key')):
+        # A form rendered before keys existed: it can't be de-duplicated.
+        data = data.copy()
+        data['idempotency_key'] = uuid.uuid4().hex
+    form = BookingForm(data, package=package)
+    if form.is_bound:
+        form.is_valid()
+    return form
 
 @csrf_exempt
 def payment_complete(request):
-    # Called by JS after successful payment, update status and send mail
+    # Called by JS once Stripe.js confirms the payment. The booking's status
+    # is set by the webhook, so this only reports what we already know.
     if request.method == "POST":
         import json
         data = json.loads(request.body.decode())
         booking_id = data.get('booking_id')
         payment_intent_id = data.get('payment_intent_id')
-        booking = get_object_or_404(Booking, id=booking_id, payment_intent_id=payment_intent_id)
-        try:
-            pi = stripe.PaymentIntent.retrieve(payment_intent_id)
-            if pi['status'] == 'succeeded':
-                booking.status = 'paid'
-                booking.save()
-                
-                # Send booking confirmation email asynchronously (non-blocking)
-                send_booking_mail_async(booking.user, booking)
-                
-                return render(request, 'bookings/booking_success.html', {'booking': booking})
-        except Exception:
-            booking.status = 'failed'
-            booking.save()
+        booking = get_object_or_404(
+            Booking.objects.select_related('package'), id=booking_id, payment_intent_id=payment_intent_id,
+        )
+        if booking.status == 'paid':
+            return render(request, 'bookings/booking_success.html', {'booking': booking})
+        if booking.status == 'pending':
+            return render(request, 'bookings/booking_processing.html', {'booking': booking})
         return render(request, 'bookings/booking_fail.html', {'booking': booking})
     # fallback if someone GETs this URL
     return redirect("home:homepage")
 
-def send_booking_mail(user, booking):
-    subject = f'Your Triplicity Booking #{booking.booking_id} is Confirmed!'
-    message = f"""Dear {user.get_full_name()},
+@csrf_exempt
+@require_POST
+def payment_webhook(request):
+    # Stripe retries anything that isn't a 2xx, so the event is stored
+    # before it is applied and a replay of a stored event is a no-op.
+    try:
+        event = get_gateway().parse_event(request.body, request.headers.get('Stripe-Signature', ''))
+    except InvalidWebhook:
+        return HttpResponseBadRequest("Invalid signature")
+    record_event(event)
+    process_event(event.id)
+    return HttpResponse(status=200)
 
-Thank you for booking "{booking.package.title}" ({booking.person_count} person(s), total ₹{booking.total_amount}).
+@login_required
+def my_bookings(request):
+    bookings = Booking.objects.filter(user=request.user)
+    # Every tab count and the total spend in one query over the user's rows.
+    summary = bookings.aggregate(
+        total_count=Count('pk'),
+        total_spent=Sum('total_amount', filter=Q(status='paid')),
+        **{f'{status}_count': Count('pk', filter=Q(status=status)) for status, _ in Booking.STATUS_CHOICES},
+    )
+    status = request.GET.get('status')
+    if status not in dict(Booking.STATUS_CHOICES):
+        status = None
+    if status:
+        bookings = bookings.filter(status=status)
+    page = keyset_paginate(
+        bookings.select_related('package', 'departure'),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        page_size=BOOKINGS_PAGE_SIZE,
+    )
+    tabs = [
+        {'status': value, 'label': label, 'count': summary[f'{value}_count']}
+        for value, label in Booking.STATUS_CHOICES
+    ]
+    return render(request, 'bookings/booking_history.html', {
+        'bookings': page,
+        'page': page,
+        'summary': summary,
+        'tabs': tabs,
+        'status': status,
+    })
 
-Booking ID: {booking.booking_id}
-Package: {booking.package.title}
-Persons: {booking.person_count}
-Total Paid: ₹{booking.total_amount}
-Booking Date: {booking.created_at.date()}
-Status: Confirmed
 
-We look forward to being a part of your journey!
-- Triplicity Team
-"""
+def _date_param(request, name):
+    """A YYYY-MM-DD query parameter; None if absent, ValueError if it isn't a real date."""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    day = parse_date(value)  # raises ValueError for e.g. 2026-02-30
+    if day is None:
+        raise ValueError(f"Invalid date: {value}")
+    return day
+
+@staff_member_required
+def revenue_dashboard(request):
+    # Reads only the daily rollup tables, never the bookings table.
     try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-        print(f"Booking confirmation email sent to {user.email}")
-    except Exception as e:
-        print(f"Error sending booking confirmation email: {e}")
+        end = _date_param(request, 'end') or timezone.localdate()
+        start = _date_param(request, 'start') or end - timedelta(days=29)
+    except ValueError:
+        return HttpResponseBadRequest("start and end must be dates as YYYY-MM-DD.")
+    package_stats = DailyPackageStats.objects.filter(date__range=(start, end))
+    paid = package_stats.filter(status='paid')
+    totals = dict(bookings=Sum('bookings'), persons=Sum('persons'), revenue=Sum('revenue'))
 
-@login_required
-def my_bookings(request):
-    bookings = Booking.objects.filter(user=request.user).select_related('package')
-    return render(request, 'bookings/booking_history.html', {'bookings': bookings})
+    return render(request, 'bookings/revenue_dashboard.html', {
+        'start': start,
+        'end': end,
+        'by_status': package_stats.values('status').annotate(**totals).order_by('status'),
+        'daily': paid.values('date').annotate(**totals).order_by('date'),
+        'top_packages': paid.values('package__title', 'package__slug').annotate(**totals).order_by('-revenue')[:10],
+        'categories': DailyCategoryStats.objects.filter(date__range=(start, end), status='paid')
+            .values('category__name').annotate(**totals).order_by('-revenue'),
+    })
+
+
+@staff_member_required
+def export_bookings(request):
+    try:
+        start = _date_param(request, 'start')
+        end = _date_param(request, 'end')
+    except ValueError:
+        return HttpResponseBadRequest("start and end must be dates as YYYY-MM-DD.")
+    status = request.GET.get('status')
+    if status not in dict(Booking.STATUS_CHOICES):
+        status = None
+    chunks = csv_chunks(iter_rows(export_queryset(start, end, status)))
+    if isinstance(request, ASGIRequest):
+        chunks = aiter_sync(chunks)
+    response = StreamingHttpResponse(chunks, content_type='text/csv')
+    filename = '-'.join(['bookings', *(str(part) for part in (start, end, status) if part)])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
\ No newline at end of file
@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.utils import timezone
+
+from jobqueue.queue import enqueue_many
+
+from .models import Booking, PaymentEvent
+from .transitions import transition_bookings
+
+PAID_EVENTS = {'payment_intent.succeeded'}
+FAILED_EVENTS = {'payment_intent.payment_failed', 'payment_intent.canceled'}
+
+# A failed attempt can still be followed by a successful one on the same
+# PaymentIntent (the customer retries with another card), so `paid` may
+# overwrite `failed`. Nothing overwrites `paid`.
+PAYABLE_STATUSES = ('pending', 'failed')
+
+
+def record_event(event):
+    """
+    Store a verified GatewayEvent. Returns (PaymentEvent, created).
+
+    The event id is unique, so a redelivered webhook finds the first row.
+    """
+    return PaymentEvent.objects.get_or_create(
+        event_id=event.id,
+        defaults={
+            'type': event.type,
+            'payment_intent_id': event.payment_intent_id,
+            'payload': event.payload,
+        },
+    )
+
+
+def mark_paid(payment_intent_ids):
+    moved = transition_bookings(
+        Booking.objects.filter(payment_intent_id__in=payment_intent_ids), 'paid', PAYABLE_STATUSES,
+    )
+    # Queued in the same transaction as the status change.
+    enqueue_many('bookings.send_booking_mail', [{'booking_id': row.pk} for row in moved])
+    return len(moved)
+
+
+def mark_failed(payment_intent_ids):
+    return len(transition_bookings(
+        Booking.objects.filter(payment_intent_id__in=payment_intent_ids), 'failed', ('pending',),
+    ))
+
+
+def process_event(event_id):
+    """
+    Apply one recorded event, at most once.
+
+    The row lock makes concurrent deliveries of the same event wait for each
+    other; whoever comes second sees processed_at set and does nothing.
+    Transitions are single conditional UPDATEs, so events arriving out of
+    order can't move a booking backwards.
+    """
+    with transaction.atomic():
+        event = (
+            PaymentEvent.objects.select_for_update()
+            .filter(event_id=event_id, processed_at__isnull=True)
+            .first()
+        )
+        if event is None:
+            return False
+        if event.payment_intent_id:
+            if event.type in PAID_EVENTS:
+                mark_paid([event.payment_intent_id])
+            elif event.type in FAILED_EVENTS:
+                mark_failed([event.payment_intent_id])
+        event.processed_at = timezone.now()
+        event.save(update_fields=['processed_at'])
+    return True
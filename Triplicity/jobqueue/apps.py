@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobqueueConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobqueue'
+    verbose_name = 'Background Jobs'
+
+    def ready(self):
+        # Each app registers its handlers in a jobs.py module.
+        autodiscover_modules('jobs')
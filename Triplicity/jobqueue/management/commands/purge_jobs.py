@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobqueue.models import Job
+
+
+class Command(BaseCommand):
+    help = "Delete finished jobs older than a number of days."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14)
+        parser.add_argument('--include-failed', action='store_true',
+                            help="Also delete jobs that exhausted their retries.")
+
+    def handle(self, *args, **options):
+        statuses = ['done', 'failed'] if options['include_failed'] else ['done']
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = Job.objects.filter(status__in=statuses, finished_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} job(s)."))
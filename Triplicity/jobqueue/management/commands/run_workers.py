@@ -0,0 +1,137 @@
+import signal
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import Count, Min
+from django.utils import timezone
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from jobqueue import queue
+from jobqueue.models import Job
+
+# How often the supervising thread looks for jobs abandoned by dead workers.
+REQUEUE_INTERVAL = 60
+
+queue_depth = Gauge('triplicity_jobs_queued', 'Jobs waiting to run, including ones not yet due.')
+queue_lag = Gauge('triplicity_jobs_oldest_due_seconds', 'Age of the oldest due job still queued.')
+jobs_processed = Counter('triplicity_jobs_processed', 'Jobs run by workers.', ['name', 'result'])
+job_wait = Histogram(
+    'triplicity_job_wait_seconds', 'Time from a job becoming due to a worker starting it.', ['name'],
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+)
+job_duration = Histogram('triplicity_job_duration_seconds', 'Time spent running a job.', ['name'])
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue with a bounded pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Worker threads (default: 4).")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds an idle worker sleeps before checking again.")
+        parser.add_argument('--metrics-port', type=int,
+                            help="Serve Prometheus metrics on this port.")
+        parser.add_argument('--stale-after', type=int, default=15 * 60,
+                            help="Requeue jobs left running this many seconds by a dead worker.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once no due jobs remain instead of polling forever.")
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop.set())
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'])
+
+        self.requeue_stale(options)
+
+        self.stdout.write(f"Starting {options['workers']} worker(s)...")
+        threads = [
+            threading.Thread(target=self.work, args=(options,), name=f'job-worker-{n}', daemon=True)
+            for n in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        last_requeue = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            self.sample_queue()
+            # Jobs left running by a crashed worker (here or elsewhere).
+            if time.monotonic() - last_requeue >= REQUEUE_INTERVAL:
+                self.requeue_stale(options)
+                last_requeue = time.monotonic()
+            self.stop.wait(5)
+        self.sample_queue()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
+
+    def requeue_stale(self, options):
+        try:
+            requeued = queue.requeue_stale(timedelta(seconds=options['stale_after']))
+        except DatabaseError as exc:
+            self.stderr.write(f"Couldn't requeue stale jobs: {exc}")
+            return
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+
+    def sample_queue(self):
+        now = timezone.now()
+        stats = Job.objects.filter(status='queued').aggregate(
+            depth=Count('pk'), oldest=Min('run_at'),
+        )
+        queue_depth.set(stats['depth'])
+        oldest = stats['oldest']
+        queue_lag.set(max((now - oldest).total_seconds(), 0) if oldest else 0)
+        close_old_connections()
+
+    def work(self, options):
+        # One SMTP connection per worker, opened by the first mail job, kept
+        # open while there is work and closed when the worker goes idle so
+        # the server doesn't time it out.
+        mail = None
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    job = queue.claim()
+                except DatabaseError as exc:
+                    # Lock contention or a dropped connection; try again shortly.
+                    self.stderr.write(f"Couldn't claim a job: {exc}")
+                    self.stop.wait(options['poll_interval'])
+                    continue
+                if job is None:
+                    if mail is not None:
+                        mail.close()
+                        mail = None
+                    if options['once']:
+                        return
+                    self.stop.wait(options['poll_interval'])
+                    continue
+
+                job_wait.labels(job.name).observe(max((job.started_at - job.run_at).total_seconds(), 0))
+                started = time.monotonic()
+                error = None
+                try:
+                    # Not opened here: only mail handlers open it (and keep it
+                    # open between jobs), so other jobs don't depend on SMTP.
+                    if mail is None:
+                        mail = get_connection()
+                    queue.get_handler(job.name)(connection=mail, **job.payload)
+                except Exception:
+                    error = traceback.format_exc()
+                    # The connection may be what failed; start a fresh one.
+                    if mail is not None:
+                        mail.close()
+                    mail = None
+                job_duration.labels(job.name).observe(time.monotonic() - started)
+                result = queue.finish(job, error)
+                jobs_processed.labels(job.name, result).inc()
+                if error:
+                    self.stderr.write(f"Job {job.pk} ({job.name}) {result}: {error.strip().splitlines()[-1]}")
+        finally:
+            if mail is not None:
+                mail.close()
+            connection.close()
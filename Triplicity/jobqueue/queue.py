@@ -0,0 +1,101 @@
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+_handlers = {}
+
+BACKOFF_BASE = 30            # seconds before the first retry
+BACKOFF_MAX = 60 * 60        # never wait more than an hour between tries
+
+
+def register(name):
+    """
+    Register a job handler under ``name``.
+
+    Handlers are called as ``handler(connection=..., **payload)`` where
+    ``connection`` is the worker's reusable mail connection, not yet opened:
+    handlers that send mail call ``connection.open()`` first (a no-op when
+    it already is). Raising retries the job with backoff.
+    """
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers[name]
+
+
+def enqueue(name, *, max_attempts=5, **payload):
+    """
+    Queue a job. Inside a transaction the row commits (or rolls back) with
+    the rest of the caller's writes, so a job is never lost or orphaned.
+    """
+    if name not in _handlers:
+        raise ValueError(f"No job handler registered as {name!r}")
+    return Job.objects.create(name=name, payload=payload, max_attempts=max_attempts)
+
+
+def enqueue_many(name, payloads, *, max_attempts=5):
+    """Queue one job per payload dict with a single INSERT, like ``enqueue``."""
+    if name not in _handlers:
+        raise ValueError(f"No job handler registered as {name!r}")
+    return Job.objects.bulk_create(
+        [Job(name=name, payload=payload, max_attempts=max_attempts) for payload in payloads],
+        batch_size=500,
+    )
+
+
+def backoff(attempts):
+    """Exponential backoff with jitter: ~30s, 60s, 2m, 4m... capped at an hour."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim():
+    """
+    Take the next due job, or return None.
+
+    SKIP LOCKED lets concurrent workers pick different rows; the conditional
+    UPDATE is what makes the claim exclusive on databases without it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_at__lte=now)
+            .order_by('run_at')
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status='queued').update(
+            status='running', attempts=job.attempts + 1, started_at=now,
+        )
+    if not claimed:
+        return None
+    job.status, job.attempts, job.started_at = 'running', job.attempts + 1, now
+    return job
+
+
+def finish(job, error=None):
+    now = timezone.now()
+    if error is None:
+        Job.objects.filter(pk=job.pk).update(status='done', finished_at=now, last_error='')
+        return 'done'
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(status='failed', finished_at=now, last_error=error)
+        return 'failed'
+    Job.objects.filter(pk=job.pk).update(status='queued', run_at=now + backoff(job.attempts), last_error=error)
+    return 'retry'
+
+
+def requeue_stale(older_than):
+    """Return jobs left 'running' by a worker that died back to the queue."""
+    cutoff = timezone.now() - older_than
+    return Job.objects.filter(status='running', started_at__lt=cutoff).update(status='queued')
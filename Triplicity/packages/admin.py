@@ -2,16 +2,32 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import Category, Package
+from .models import Category, Departure, Package, PriceRule
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
     list_display = ("name", "description")
 
+class DepartureInline(admin.TabularInline):
+    model = Departure
+    extra = 1
+
+class PriceRuleInline(admin.TabularInline):
+    model = PriceRule
+    extra = 0
+
 @admin.register(Package)
 class PackageAdmin(admin.ModelAdmin):
+    inlines = [DepartureInline, PriceRuleInline]
     list_display = ("title", "category", "price", "rating")
     list_filter = ("category",)
     search_fields = ("title",)
     prepopulated_fields = {"slug": ("title",)}
+
+@admin.register(Departure)
+class DepartureAdmin(admin.ModelAdmin):
+    list_display = ("package", "date", "capacity", "seats_left")
+    list_filter = ("date",)
+    search_fields = ("package__title",)
+    list_select_related = ("package",)
@@ -0,0 +1,131 @@
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+
+from .filters import PackageFilter
+from .models import Category, Package
+from .pagination import keyset_paginate
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Public field name -> column(s) selected for it. Only the columns behind the
+# requested fields are fetched; `category` is joined in the same query.
+PACKAGE_FIELDS = {
+    'id': ('id',),
+    'slug': ('slug',),
+    'title': ('title',),
+    'category': ('category__slug', 'category__name'),
+    'price': ('price',),
+    'rating': ('rating',),
+    'duration': ('duration',),
+    'days': ('days',),
+    'nights': ('nights',),
+    'image': ('image',),
+    'include_meals': ('include_meals',),
+    'include_hotels': ('include_hotels',),
+    'include_flights': ('include_flights',),
+    'include_sightseeing': ('include_sightseeing',),
+    'custom_includes': ('custom_includes',),
+    'short_itinerary': ('short_itinerary',),
+    'created_at': ('created_at',),
+}
+DEFAULT_PACKAGE_FIELDS = ('slug', 'title', 'category', 'price', 'rating', 'duration', 'image')
+
+CATEGORY_FIELDS = ('slug', 'name', 'description')
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'separators': (',', ':')})
+
+
+def api_error(message, status=400):
+    return _json({'error': message}, status=status)
+
+
+def _requested_fields(request):
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(DEFAULT_PACKAGE_FIELDS), []
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in PACKAGE_FIELDS]
+    return fields, unknown
+
+
+def _columns(fields):
+    columns = {'id', 'created_at'}  # keyset cursor
+    for name in fields:
+        columns.update(PACKAGE_FIELDS[name])
+    return sorted(columns)
+
+
+def _serialize(row, fields):
+    item = {}
+    for name in fields:
+        if name == 'category':
+            item['category'] = (
+                {'slug': row['category__slug'], 'name': row['category__name']}
+                if row['category__slug'] else None
+            )
+        elif name == 'image':
+            item['image'] = default_storage.url(row['image']) if row['image'] else None
+        else:
+            item[name] = row[name]
+    return item
+
+
+def _page_url(request, **cursor):
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params.update(cursor)
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+@require_GET
+@gzip_page
+def package_list(request):
+    fields, unknown = _requested_fields(request)
+    if unknown:
+        return api_error(f"Unknown field(s): {', '.join(unknown)}")
+    try:
+        limit = min(max(int(request.GET.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return api_error("limit must be an integer")
+
+    packages = Package.objects.all()
+    if request.GET.get('category'):
+        packages = packages.filter(category__slug=request.GET['category'])
+    packages = PackageFilter(request.GET).apply(packages)
+
+    page = keyset_paginate(
+        packages.values(*_columns(fields)),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        page_size=limit,
+    )
+    return _json({
+        'results': [_serialize(row, fields) for row in page],
+        'next': _page_url(request, after=page.next_cursor) if page.has_next else None,
+        'previous': _page_url(request, before=page.previous_cursor) if page.has_previous else None,
+    })
+
+
+@require_GET
+@gzip_page
+def package_detail(request, package_slug):
+    fields, unknown = _requested_fields(request)
+    if unknown:
+        return api_error(f"Unknown field(s): {', '.join(unknown)}")
+    row = Package.objects.filter(slug=package_slug).values(*_columns(fields)).first()
+    if row is None:
+        return api_error("Package not found", status=404)
+    return _json(_serialize(row, fields))
+
+
+@require_GET
+@gzip_page
+def category_list(request):
+    categories = Category.objects.order_by('name').values(*CATEGORY_FIELDS)
+    return _json({'results': list(categories)})
@@ -4,3 +4,6 @@ class PackagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'packages'
     verbose_name = 'Packages'
+
+    def ready(self):
+        from . import signals  # noqa: F401
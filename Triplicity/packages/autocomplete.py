@@ -0,0 +1,210 @@
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Category, Package
+
+INDEX_KEY = 'packages:autocomplete:index'
+SEQ_KEY = f'{INDEX_KEY}:seq'
+BUILD_KEY = f'{INDEX_KEY}:building'
+INDEX_TIMEOUT = 60 * 60 * 24  # rebuilt from the table at least daily
+BUILD_LOCK_TIMEOUT = 60
+
+# A worker further behind than this many changes reloads the whole index
+# instead of replaying them.
+MAX_CHANGES = 1000
+
+# Worker-local copy of the shared index: the last change applied, the sorted
+# entries, and each package's/category's entries so they can be replaced.
+_local = {'seq': None, 'entries': [], 'items': {}}
+_lock = threading.Lock()
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+def _entries_for(kind, pk, label, slug, rating):
+    """
+    One sorted-array entry per word start, so "Kerala Backwaters" is found
+    by both "ker" and "back".
+
+    Entries are (key, -rating, label, kind, slug, pk) tuples; sorting them
+    sorts by key first, which is what bisect needs.
+    """
+    words = normalize(label).split()
+    return [
+        (' '.join(words[i:]), -float(rating), label, kind, slug, pk)
+        for i in range(len(words))
+    ]
+
+
+def _package_entries(package):
+    return _entries_for('package', package.pk, package.title, package.slug, package.rating)
+
+
+def _category_entries(category):
+    # Categories have no rating of their own; rank them above any package.
+    return _entries_for('category', category.pk, category.name, category.slug, 10)
+
+
+def build_index():
+    entries = []
+    for package in Package.objects.only('pk', 'title', 'slug', 'rating').iterator(chunk_size=2000):
+        entries.extend(_package_entries(package))
+    for category in Category.objects.only('pk', 'name', 'slug'):
+        entries.extend(_category_entries(category))
+    entries.sort()
+    return entries
+
+
+def _item_entries(kind, pk):
+    if kind == 'package':
+        package = Package.objects.filter(pk=pk).only('pk', 'title', 'slug', 'rating').first()
+        return _package_entries(package) if package else []
+    category = Category.objects.filter(pk=pk).only('pk', 'name', 'slug').first()
+    return _category_entries(category) if category else []
+
+
+def _by_item(entries):
+    items = {}
+    for entry in entries:
+        items.setdefault((entry[3], entry[5]), []).append(entry)
+    return items
+
+
+def _change_key(seq):
+    return f'{INDEX_KEY}:change:{seq}'
+
+
+def _advance(delta=1):
+    try:
+        return cache.incr(SEQ_KEY, delta)
+    except ValueError:
+        # Evicted or never set: start far past any number a worker has seen,
+        # so every worker reloads instead of replaying.
+        cache.add(SEQ_KEY, time.time_ns(), None)
+        return cache.incr(SEQ_KEY, delta)
+
+
+def _current_seq():
+    seq = cache.get(SEQ_KEY)
+    if seq is None:
+        cache.add(SEQ_KEY, time.time_ns(), None)
+        seq = cache.get(SEQ_KEY)
+    return seq
+
+
+def _replay(base, entries, items, seq):
+    """
+    Apply changes ``base + 1 .. seq`` to a copy of an index. None if there
+    are too many, or one is missing (evicted, or not written yet).
+    """
+    if seq == base:
+        return entries, items
+    if not 0 < seq - base <= MAX_CHANGES:
+        return None
+    keys = [_change_key(n) for n in range(base + 1, seq + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return None
+    entries, items = list(entries), dict(items)
+    for key in keys:
+        kind, pk, new = changes[key]
+        for entry in items.pop((kind, pk), ()):
+            i = bisect.bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+        for entry in new:
+            bisect.insort(entries, entry)
+        if new:
+            items[(kind, pk)] = new
+    return entries, items
+
+
+def _refresh(seq):
+    if _local['seq'] is not None:
+        index = _replay(_local['seq'], _local['entries'], _local['items'], seq)
+        if index is not None:
+            _local.update(seq=seq, entries=index[0], items=index[1])
+            return
+
+    snapshot = cache.get(INDEX_KEY)
+    if snapshot is not None:
+        base, entries = snapshot
+        seq = max(seq, base)
+        index = _replay(base, entries, _by_item(entries), seq)
+        if index is not None:
+            if seq != base:
+                # Save the next worker that starts the same replay.
+                cache.set(INDEX_KEY, (seq, index[0]), INDEX_TIMEOUT)
+            _local.update(seq=seq, entries=index[0], items=index[1])
+            return
+
+    # One worker rebuilds; the rest keep serving their local copy meanwhile.
+    if not cache.add(BUILD_KEY, 1, BUILD_LOCK_TIMEOUT) and _local['seq'] is not None:
+        return
+    # Every change numbered up to `seq` had committed before it was
+    # numbered, so the tables already include it.
+    entries = build_index()
+    cache.set(INDEX_KEY, (seq, entries), INDEX_TIMEOUT)
+    _local.update(seq=seq, entries=entries, items=_by_item(entries))
+
+
+def _current_entries():
+    seq = _current_seq()
+    if _local['seq'] != seq:
+        with _lock:
+            if _local['seq'] != seq:
+                _refresh(seq)
+    return _local['entries']
+
+
+def record_change(kind, pk):
+    """
+    Publish one package's or category's entries to every worker, which
+    swap them into their local copy on their next lookup.
+
+    Call once the change has committed. The entries are read after the
+    change is numbered, so for concurrent saves of the same row the last
+    numbered change carries its latest state.
+    """
+    seq = _advance()
+    cache.set(_change_key(seq), (kind, pk, _item_entries(kind, pk)), INDEX_TIMEOUT)
+
+
+def invalidate_index():
+    """Make every worker reload the index from the tables (after a bulk import)."""
+    _advance(MAX_CHANGES + 1)
+
+
+def suggest(query, limit=8):
+    prefix = normalize(query)
+    if not prefix:
+        return []
+    entries = _current_entries()
+
+    # Keys starting with the prefix sort between it and the prefix with its
+    # last character bumped; every match is ranked, not just the first few.
+    lo = bisect.bisect_left(entries, (prefix,))
+    hi = bisect.bisect_left(entries, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), lo)
+    # One entry per item (its entries share its rating and label).
+    matches = {(entry[3], entry[5]): entry for entry in entries[lo:hi]}
+    # Best-rated first, alphabetical among equals.
+    candidates = heapq.nsmallest(limit, matches.values(), key=lambda entry: (entry[1], entry[2]))
+
+    results = []
+    for _key, _rating, label, kind, slug, pk in candidates:
+        if kind == 'package':
+            url = reverse('packages:detail', args=[slug])
+        else:
+            url = reverse('packages:list_by_category', args=[slug])
+        results.append({'label': label, 'type': kind, 'url': url})
+    return results
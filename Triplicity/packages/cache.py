@@ -0,0 +1,214 @@
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from prometheus_client import Counter
+
+from .models import Category, Package
+
+PAGE_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Cache-Control for anonymous pages: browsers revalidate after a minute,
+# shared caches (CDN) after five.
+BROWSER_MAX_AGE = 60
+SHARED_MAX_AGE = 60 * 5
+
+page_cache_lookups = Counter(
+    'triplicity_package_page_cache_lookups',
+    'Rendered package page cache lookups.',
+    ['page', 'result'],
+)
+
+# Version stamps. Every cached page key embeds the versions it depends on, so
+# bumping a version from a signal makes the old entries unreachable at once.
+CATALOG = 'catalog'          # the "all packages" list
+CATEGORIES = 'categories'    # category names/slugs, shown on every page
+CATEGORY = 'category'        # one category's list, keyed by slug
+PACKAGE = 'package'          # one package's detail page, keyed by slug
+
+
+def _version_key(scope, name=''):
+    return f'packages:version:{scope}:{name}'
+
+
+def get_versions(*scopes):
+    """Fetch several (scope, name) versions in one cache round-trip."""
+    keys = [_version_key(*scope) for scope in scopes]
+    found = cache.get_many(keys)
+    # Seeded like bump_version: an evicted version must never read back as
+    # a value something was already cached (or memoised) under.
+    seed = time.time_ns()
+    missing = {key: seed for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def is_shared():
+    """
+    Whether the cache is shared by every worker. A per-process LocMemCache
+    only sees its own process's version bumps.
+    """
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def bump_version(scope, name=''):
+    # Versions are nanosecond timestamps, so they double as the time the
+    # pages last changed (see conditional_page). Any new value will do as
+    # long as it is past the current one, so a race between two bumps is
+    # harmless.
+    key = _version_key(scope, name)
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), None)
+
+
+def _version_time(version):
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+
+
+def invalidate_package_pages(package, previous=None):
+    """Bump every version a package's pages hang off, including old ones."""
+    slugs = {package.slug}
+    category_slugs = {package.category.slug if package.category_id else None}
+    if previous:
+        slugs.add(previous['slug'])
+        category_slugs.add(previous['category__slug'])
+
+    bump_version(CATALOG)
+    for slug in slugs:
+        bump_version(PACKAGE, slug)
+    for slug in category_slugs - {None}:
+        bump_version(CATEGORY, slug)
+
+
+def list_cache_key(request, category_slug=None):
+    if category_slug:
+        versions = get_versions((CATEGORY, category_slug), (CATEGORIES,))
+    else:
+        versions = get_versions((CATALOG,), (CATEGORIES,))
+    params = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    version = '.'.join(str(v) for v in versions)
+    return f'packages:page:list:{category_slug or "*"}:{version}:{params}'
+
+
+def detail_cache_key(request, package_slug):
+    versions = get_versions((PACKAGE, package_slug), (CATEGORIES,))
+    version = '.'.join(str(v) for v in versions)
+    return f'packages:page:detail:{package_slug}:{version}'
+
+
+def cache_page_versioned(page, key_func):
+    """
+    Serve anonymous GETs from the rendered-page cache.
+
+    Signed-in users get a personalised navbar, so their requests always go
+    to the view (which still reuses cached template fragments).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = key_func(request, *args, **kwargs)
+            content = cache.get(key)
+            if content is not None:
+                page_cache_lookups.labels(page, 'hit').inc()
+                response = HttpResponse(content)
+            else:
+                page_cache_lookups.labels(page, 'miss').inc()
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response.content, PAGE_CACHE_TIMEOUT)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def _list_state(request, category_slug=None):
+    # MAX(updated_at) can't see deletions, so the row counts go in too, and
+    # the version stamps, which every save and delete moves forward.
+    if not hasattr(request, '_package_state'):
+        packages = Package.objects.all()
+        if category_slug:
+            packages = packages.filter(category__slug=category_slug)
+            versions = get_versions((CATEGORY, category_slug), (CATEGORIES,))
+        else:
+            versions = get_versions((CATALOG,), (CATEGORIES,))
+        package_state = packages.aggregate(latest=Max('updated_at'), count=Count('id'))
+        category_state = Category.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+        request._package_state = (
+            [ts for ts in (package_state['latest'], category_state['latest']) if ts]
+            + [_version_time(version) for version in versions],
+            (package_state['count'], category_state['count']),
+        )
+    return request._package_state
+
+
+def _detail_state(request, package_slug):
+    if not hasattr(request, '_package_state'):
+        row = (
+            Package.objects.filter(slug=package_slug)
+            .values_list('updated_at', 'category__updated_at')
+            .first()
+        )
+        if row:
+            versions = get_versions((PACKAGE, package_slug), (CATEGORIES,))
+            row = [ts for ts in row if ts] + [_version_time(version) for version in versions]
+        request._package_state = (row, ()) if row else None
+    return request._package_state
+
+
+def _etag(request, state):
+    if state is None:
+        return None
+    timestamps, counts = state
+    user = request.user.pk if request.user.is_authenticated else ''
+    raw = '|'.join(str(part) for part in (request.get_full_path(), user, *timestamps, *counts))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _last_modified(state):
+    if not state or not state[0]:
+        return None
+    return max(state[0])
+
+
+def conditional_page(state_func):
+    """
+    Answer If-None-Match / If-Modified-Since with a 304 before rendering.
+
+    `state_func(request, *args, **kwargs)` runs one or two cheap aggregate
+    queries and reads the pages' version stamps, so deletes move the
+    validators too; the ETag also covers the query string and the signed-in
+    user, since both change the HTML.
+    """
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: _etag(request, state_func(request, *args, **kwargs)),
+            last_modified_func=lambda request, *args, **kwargs: _last_modified(state_func(request, *args, **kwargs)),
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+            else:
+                patch_cache_control(response, public=True, max_age=BROWSER_MAX_AGE, s_maxage=SHARED_MAX_AGE)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+conditional_list_page = conditional_page(_list_state)
+conditional_detail_page = conditional_page(_detail_state)
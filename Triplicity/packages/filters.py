@@ -0,0 +1,109 @@
+from django.db.models import Count, Q
+from django.http import QueryDict
+
+PRICE_BANDS = (
+    ('under-20k', 'Under ₹20,000', Q(price__lt=20000)),
+    ('20k-40k', '₹20,000 – ₹40,000', Q(price__gte=20000, price__lt=40000)),
+    ('40k-60k', '₹40,000 – ₹60,000', Q(price__gte=40000, price__lt=60000)),
+    ('over-60k', '₹60,000 & above', Q(price__gte=60000)),
+)
+
+RATINGS = (
+    ('4.5', '4.5 & up', Q(rating__gte=4.5)),
+    ('4', '4 & up', Q(rating__gte=4)),
+    ('3', '3 & up', Q(rating__gte=3)),
+)
+
+DURATIONS = (
+    ('1-3', '1 – 3 days', Q(days__gte=1, days__lte=3)),
+    ('4-6', '4 – 6 days', Q(days__gte=4, days__lte=6)),
+    ('7-9', '7 – 9 days', Q(days__gte=7, days__lte=9)),
+    ('10-plus', '10+ days', Q(days__gte=10)),
+)
+
+INCLUSIONS = (
+    ('meals', 'Meals', Q(include_meals=True)),
+    ('hotels', 'Hotels', Q(include_hotels=True)),
+    ('flights', 'Flights', Q(include_flights=True)),
+    ('sightseeing', 'Sightseeing', Q(include_sightseeing=True)),
+)
+
+# (query param, sidebar label, options, allows several values at once)
+FACETS = (
+    ('price', 'Price', PRICE_BANDS, False),
+    ('rating', 'Rating', RATINGS, False),
+    ('duration', 'Duration', DURATIONS, False),
+    ('includes', 'Includes', INCLUSIONS, True),
+)
+
+
+class PackageFilter:
+    """
+    Parses facet selections from a query string and computes sidebar counts.
+
+    Each option's count answers "how many packages would I see if I picked
+    this?", i.e. every other active facet applies but the option's own
+    single-choice facet does not. All counts come from a single aggregate.
+    """
+
+    def __init__(self, params):
+        self.selected = {}
+        for name, _label, options, multiple in FACETS:
+            valid = {value for value, _, _ in options}
+            values = [v for v in params.getlist(name) if v in valid]
+            if not multiple:
+                values = values[:1]
+            if values:
+                self.selected[name] = values
+
+    def __bool__(self):
+        return bool(self.selected)
+
+    def q(self, exclude=None):
+        condition = Q()
+        for name, _label, options, _multiple in FACETS:
+            if name == exclude:
+                continue
+            for value, _, option_q in options:
+                if value in self.selected.get(name, ()):
+                    condition &= option_q
+        return condition
+
+    def apply(self, queryset):
+        return queryset.filter(self.q())
+
+    def querystring(self, **changes):
+        params = QueryDict(mutable=True)
+        selected = {**self.selected, **changes}
+        for name, _label, _options, _multiple in FACETS:
+            if selected.get(name):
+                params.setlist(name, selected[name])
+        return params.urlencode()
+
+    def facets(self, queryset):
+        aggregates = {}
+        for name, _label, options, multiple in FACETS:
+            base = self.q() if multiple else self.q(exclude=name)
+            for value, _, option_q in options:
+                aggregates[f'{name}__{value}'] = Count('pk', filter=base & option_q)
+        counts = queryset.aggregate(**aggregates)
+
+        facets = []
+        for name, label, options, multiple in FACETS:
+            current = self.selected.get(name, [])
+            choices = []
+            for value, option_label, _ in options:
+                selected = value in current
+                if multiple:
+                    toggled = [v for v in current if v != value] if selected else current + [value]
+                else:
+                    toggled = [] if selected else [value]
+                choices.append({
+                    'value': value,
+                    'label': option_label,
+                    'count': counts[f'{name}__{value}'],
+                    'selected': selected,
+                    'querystring': self.querystring(**{name: toggled}),
+                })
+            facets.append({'name': name, 'label': label, 'options': choices})
+        return facets
@@ -0,0 +1,30 @@
+from django import forms
+
+# Column order used by export_packages and accepted by import_packages.
+TRANSFER_FIELDS = (
+    'slug', 'title', 'category', 'category_name', 'image', 'price', 'rating',
+    'duration', 'include_meals', 'include_hotels', 'include_flights',
+    'include_sightseeing', 'custom_includes', 'short_itinerary',
+)
+
+
+class PackageImportForm(forms.Form):
+    """Validates one row of a supplier feed before it is upserted."""
+    slug = forms.SlugField(max_length=50)
+    title = forms.CharField(max_length=200)
+    category = forms.SlugField(max_length=50, required=False)
+    category_name = forms.CharField(max_length=100, required=False)
+    image = forms.CharField(max_length=100, required=False)
+    price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    rating = forms.DecimalField(max_digits=2, decimal_places=1, min_value=0, max_value=5, required=False)
+    duration = forms.CharField(max_length=50)
+    include_meals = forms.BooleanField(required=False)
+    include_hotels = forms.BooleanField(required=False)
+    include_flights = forms.BooleanField(required=False)
+    include_sightseeing = forms.BooleanField(required=False)
+    custom_includes = forms.CharField(required=False, strip=False)
+    short_itinerary = forms.CharField(required=False, strip=False)
+
+    def clean_rating(self):
+        rating = self.cleaned_data['rating']
+        return 0 if rating is None else rating
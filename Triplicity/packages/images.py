@@ -0,0 +1,89 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Preset name -> (target width, default `sizes` attribute)
+PRESETS = {
+    'thumb': (320, '160px'),
+    'card': (640, '(min-width: 992px) 300px, (min-width: 768px) 50vw, 100vw'),
+    'hero': (1280, '(min-width: 992px) 58vw, 100vw'),
+}
+WIDTHS = sorted(width for width, _ in PRESETS.values())
+
+# (file extension, Pillow format, save options)
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+# Uploads are resized here, off the request path; two workers keep a burst of
+# admin uploads from competing with request threads for CPU.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='package-images')
+
+
+def derivative_name(image_name, width, extension):
+    root, _ = os.path.splitext(image_name)
+    return f'{root}.{width}w.{extension}'
+
+
+def generate_derivatives(image_name, storage=None):
+    """
+    Write resized WebP and JPEG copies of an image next to the original.
+
+    Returns the widths that were produced. Presets wider than the original
+    are not upscaled; the original width is re-encoded in their place.
+    """
+    storage = storage or default_storage
+    with storage.open(image_name, 'rb') as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    widths = [width for width in WIDTHS if width <= image.width]
+    if image.width < WIDTHS[-1] and image.width not in widths:
+        widths.append(image.width)
+    for width in widths:
+        # Scaled by width alone, whatever the aspect ratio, so each file is
+        # exactly as wide as its srcset `w` descriptor says.
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for extension, image_format, options in FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            name = derivative_name(image_name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+    return widths
+
+
+def build_package_derivatives(package_id):
+    from .cache import invalidate_package_pages
+    from .models import Package
+
+    try:
+        package = Package.objects.select_related('category').get(pk=package_id)
+        if not package.image:
+            return
+        widths = generate_derivatives(package.image.name)
+        # .update() skips post_save, so this doesn't reschedule itself.
+        Package.objects.filter(pk=package.pk, image=package.image.name).update(
+            image_widths=widths, updated_at=timezone.now(),
+        )
+        invalidate_package_pages(package)
+    except Exception:
+        logger.exception("Could not build image derivatives for package %s", package_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_derivatives(package_id):
+    _executor.submit(build_package_derivatives, package_id)
@@ -0,0 +1,78 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from packages import pricing
+from packages.models import Package, PriceRule
+
+
+def _synthetic_rules(rng, seasons=6, tiers=4):
+    """An unsaved, fairly busy rule table: seasons, tiers, child price, surcharges."""
+    rules = []
+    start = date.today()
+    for _ in range(seasons):
+        start += timedelta(days=rng.randint(10, 60))
+        rules.append(PriceRule(kind=PriceRule.SEASON, start_date=start,
+                               end_date=start + timedelta(days=rng.randint(7, 45)),
+                               percent=Decimal(rng.randint(-20, 35))))
+    for n in range(tiers):
+        rules.append(PriceRule(kind=PriceRule.GROUP, min_persons=4 + n * 4, percent=Decimal(-5 * (n + 1))))
+    rules.append(PriceRule(kind=PriceRule.CHILD, percent=Decimal('60')))
+    rules.append(PriceRule(kind=PriceRule.SURCHARGE, label='Fuel', amount=Decimal('499.50')))
+    rules.append(PriceRule(kind=PriceRule.SURCHARGE, label='Peak', percent=Decimal('7.5'),
+                           start_date=date.today(), end_date=date.today() + timedelta(days=30)))
+    return rules
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the pricing engine: rule compilation, single quotes and batch \"from\" prices."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quotes', type=int, default=100000)
+        parser.add_argument('--page-size', type=int, default=12,
+                            help="Packages per batch \"from\" price call (one listing page).")
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+
+        tables = [_synthetic_rules(rng) for _ in range(1000)]
+        began = time.perf_counter()
+        compiled = [pricing.compile_rules(rules) for rules in tables]
+        elapsed = time.perf_counter() - began
+        self.stdout.write(f"compile: {elapsed / len(tables) * 1e6:.1f}us per package ({len(tables[0])} rules)")
+
+        requests = [
+            (Decimal(rng.randint(5000, 90000)), rng.choice(compiled), rng.randint(1, 12), rng.randint(0, 3),
+             date.today() + timedelta(days=rng.randint(0, 400)))
+            for _ in range(options['quotes'])
+        ]
+        began = time.perf_counter()
+        for base, rules, adults, children, day in requests:
+            pricing.price(base, rules, adults, children, day)
+        elapsed = time.perf_counter() - began
+        self.stdout.write(f"quote:   {elapsed / len(requests) * 1e6:.2f}us each "
+                          f"({len(requests) / elapsed:,.0f}/s) over compiled rules")
+
+        packages = list(Package.objects.order_by('-created_at')[:options['page_size']])
+        if not packages:
+            return
+        pricing._compiled.clear()
+        with CaptureQueriesContext(connection) as cold:
+            began = time.perf_counter()
+            pricing.attach_from_prices(packages)
+            cold_elapsed = time.perf_counter() - began
+        rounds = 200
+        with CaptureQueriesContext(connection) as warm:
+            began = time.perf_counter()
+            for _ in range(rounds):
+                pricing.attach_from_prices(packages)
+            warm_elapsed = (time.perf_counter() - began) / rounds
+        self.stdout.write(
+            f"from prices for {len(packages)} packages: cold {cold_elapsed * 1000:.2f}ms "
+            f"({len(cold)} queries), warm {warm_elapsed * 1000:.3f}ms ({len(warm) // rounds} queries)"
+        )
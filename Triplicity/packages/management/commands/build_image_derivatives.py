@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from packages import cache as page_cache
+from packages.images import generate_derivatives
+from packages.models import Package
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG copies of package images across a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help="Number of worker processes (default: CPU count).")
+        parser.add_argument('--force', action='store_true',
+                            help="Rebuild packages that already have derivatives.")
+
+    def handle(self, *args, **options):
+        packages = Package.objects.exclude(image='')
+        if not options['force']:
+            packages = packages.filter(image_widths=[])
+        pending = dict(packages.values_list('pk', 'image'))
+        if not pending:
+            self.stdout.write("No package images need derivatives.")
+            return
+
+        self.stdout.write(f"Building derivatives for {len(pending)} package(s) "
+                          f"with {options['workers']} worker(s)...")
+        built = []
+        now = timezone.now()
+        # Workers only resize files; every database write happens here.
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            futures = {pool.submit(generate_derivatives, image): pk for pk, image in pending.items()}
+            for future in as_completed(futures):
+                pk = futures[future]
+                try:
+                    widths = future.result()
+                except Exception as exc:
+                    self.stderr.write(f"Package {pk} ({pending[pk]}): {exc}")
+                    continue
+                built.append(Package(pk=pk, image_widths=widths, updated_at=now))
+
+        Package.objects.bulk_update(built, ['image_widths', 'updated_at'], batch_size=500)
+        # bulk_update sends no signals; every cached page may now be stale.
+        page_cache.bump_version(page_cache.CATEGORIES)
+        self.stdout.write(self.style.SUCCESS(
+            f"Built derivatives for {len(built)} of {len(pending)} package(s)."
+        ))
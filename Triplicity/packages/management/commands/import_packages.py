@@ -0,0 +1,154 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from packages import autocomplete
+from packages import cache as page_cache
+from packages.forms import TRANSFER_FIELDS, PackageImportForm
+from packages.models import Category, Package, parse_duration
+from packages.search import update_search_index
+
+
+class Command(BaseCommand):
+    help = "Upsert packages from a CSV or JSON Lines feed, keyed on slug."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Feed to read, or '-' for stdin.")
+        parser.add_argument('--format', choices=('csv', 'jsonl'),
+                            help="Feed format (default: guessed from the file extension).")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Validate every row without writing anything.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        feed_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+
+        self.category_ids = dict(Category.objects.values_list('slug', 'id'))
+        self.updated_columns = set()
+        imported = skipped = 0
+        batch = {}
+        started = time.monotonic()
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            for line_number, row in self.read_rows(stream, feed_format):
+                form = PackageImportForm(row)
+                if not form.is_valid():
+                    skipped += 1
+                    errors = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in form.errors.items())
+                    self.stderr.write(f"Line {line_number}: {errors}")
+                    continue
+                # Last row wins for a slug repeated within one batch.
+                batch[form.cleaned_data['slug']] = (self.columns_to_update(row), form.cleaned_data)
+                if len(batch) >= batch_size:
+                    imported += self.flush(batch, options['dry_run'])
+                    batch = {}
+                    self.report(imported, started)
+            imported += self.flush(batch, options['dry_run'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if imported and not options['dry_run']:
+            # bulk_create sends no signals, so invalidate every cached page
+            # and let the autocomplete index rebuild from the table.
+            page_cache.bump_version(page_cache.CATEGORIES)
+            autocomplete.invalidate_index()
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {imported} package(s), skipped {skipped} invalid row(s) "
+            f"in {elapsed:.1f}s ({imported / elapsed:.0f} rows/s)."
+        ))
+        if imported and not options['dry_run'] and 'image' in self.updated_columns:
+            self.stdout.write("Run build_image_derivatives to resize the imported images.")
+
+    def read_rows(self, stream, feed_format):
+        if feed_format == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise CommandError(f"Line {line_number}: invalid JSON ({exc})")
+
+    def columns_to_update(self, row):
+        # Only overwrite columns the feed actually carries, so a feed without
+        # images or itineraries doesn't blank them out on existing packages.
+        columns = [f for f in TRANSFER_FIELDS if f in row and f not in ('slug', 'category', 'category_name')]
+        if 'category' in row:
+            columns.append('category')
+        if 'duration' in columns:
+            columns += ['days', 'nights']
+        if 'image' in columns:
+            columns.append('image_widths')
+        return tuple(columns + ['updated_at'])
+
+    def resolve_category(self, data):
+        slug = data['category']
+        if not slug:
+            return None
+        if slug not in self.category_ids:
+            name = data['category_name'] or slug.replace('-', ' ').title()
+            category, _ = Category.objects.get_or_create(slug=slug, defaults={'name': name})
+            self.category_ids[slug] = category.pk
+        return self.category_ids[slug]
+
+    def flush(self, batch, dry_run):
+        if not batch or dry_run:
+            return len(batch)
+        # JSONL rows may carry different keys; each set of columns is upserted
+        # on its own so no row overwrites a column it didn't provide.
+        groups = {}
+        for columns, data in batch.values():
+            groups.setdefault(columns, []).append(self.build_package(data))
+        with transaction.atomic():
+            for columns, packages in groups.items():
+                Package.objects.bulk_create(
+                    packages,
+                    update_conflicts=True,
+                    unique_fields=['slug'],
+                    update_fields=columns,
+                )
+                self.updated_columns.update(columns)
+            update_search_index(Package.objects.filter(slug__in=batch.keys()))
+        return len(batch)
+
+    def build_package(self, data):
+        days, nights = parse_duration(data['duration'])
+        return Package(
+            slug=data['slug'],
+            title=data['title'],
+            category_id=self.resolve_category(data),
+            image=data['image'],
+            price=data['price'],
+            rating=data['rating'],
+            duration=data['duration'],
+            days=days,
+            nights=nights,
+            include_meals=data['include_meals'],
+            include_hotels=data['include_hotels'],
+            include_flights=data['include_flights'],
+            include_sightseeing=data['include_sightseeing'],
+            custom_includes=data['custom_includes'],
+            short_itinerary=data['short_itinerary'],
+        )
+
+    def report(self, imported, started):
+        if self.verbosity < 2:
+            return
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stderr.write(f"{imported} rows ({imported / elapsed:.0f} rows/s)")
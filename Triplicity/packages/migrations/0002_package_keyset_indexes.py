@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['-created_at', '-id'], name='package_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='package_cat_created_idx'),
+        ),
+    ]
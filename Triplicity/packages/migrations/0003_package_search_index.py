@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:18
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = 'packages_package_fts'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX package_search_vector_idx ON packages_package USING GIN (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE packages_package AS p SET search_vector = "
+            "setweight(to_tsvector('english', COALESCE(p.title, '')), 'A') || "
+            "setweight(to_tsvector('english', COALESCE(c.name, '')), 'B') || "
+            "setweight(to_tsvector('english', COALESCE(p.short_itinerary, '')), 'C') || "
+            "setweight(to_tsvector('english', COALESCE(p.custom_includes, '')), 'C') "
+            "FROM packages_package AS p2 LEFT JOIN packages_category AS c ON c.id = p2.category_id "
+            "WHERE p2.id = p.id"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "title, category, itinerary, includes, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, category, itinerary, includes) "
+            "SELECT p.id, p.title, COALESCE(c.name, ''), p.short_itinerary, p.custom_includes "
+            "FROM packages_package p LEFT JOIN packages_category c ON c.id = p.category_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS package_search_vector_idx")
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0002_package_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='package',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
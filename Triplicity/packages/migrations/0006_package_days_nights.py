@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0005_package_image_widths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='package',
+            name='days',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='nights',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['days', 'price'], name='package_days_price_idx'),
+        ),
+    ]
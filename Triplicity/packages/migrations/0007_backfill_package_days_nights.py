@@ -0,0 +1,49 @@
+import re
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copy of packages.models.parse_duration as of this migration.
+DAYS_RE = re.compile(r'(\d+)\s*d(?:ays?)?\b', re.IGNORECASE)
+NIGHTS_RE = re.compile(r'(\d+)\s*n(?:ights?)?\b', re.IGNORECASE)
+
+
+def parse_duration(text):
+    days = DAYS_RE.search(text or '')
+    nights = NIGHTS_RE.search(text or '')
+    days = int(days.group(1)) if days else None
+    nights = int(nights.group(1)) if nights else None
+    if days is None and nights is not None:
+        days = nights + 1
+    elif nights is None and days is not None:
+        nights = max(days - 1, 0)
+    return days, nights
+
+
+def backfill_days_nights(apps, schema_editor):
+    Package = apps.get_model('packages', 'Package')
+    last_pk = 0
+    while True:
+        batch = list(
+            Package.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', 'duration')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for package in batch:
+            package.days, package.nights = parse_duration(package.duration)
+        Package.objects.bulk_update(batch, ['days', 'nights'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0006_package_days_nights'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_days_nights, migrations.RunPython.noop),
+    ]
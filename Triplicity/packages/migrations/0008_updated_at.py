@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:24
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def backfill_package_updated_at(apps, schema_editor):
+    Package = apps.get_model('packages', 'Package')
+    Package.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0007_backfill_package_days_nights'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='package',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_package_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['updated_at'], name='package_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(fields=['category', 'updated_at'], name='package_cat_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 06:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0009_departures'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('season', 'Seasonal rate (percent, for departures in a date range)'), ('group', 'Group tier (percent, from a number of persons)'), ('child', 'Child price (percent of the adult price)'), ('surcharge', 'Surcharge (flat amount or percent, optionally dated)')], max_length=10)),
+                ('label', models.CharField(blank=True, max_length=100)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('min_persons', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('per_person', models.BooleanField(default=True, help_text='Surcharges: charge the amount per person rather than per booking.')),
+                ('package', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='packages.package')),
+            ],
+            options={
+                'ordering': ['package', 'kind', 'start_date', 'min_persons'],
+            },
+        ),
+    ]
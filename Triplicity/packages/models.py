@@ -2,11 +2,32 @@ from django.db import models
 
 # Create your models here.
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+import re
+
+DAYS_RE = re.compile(r'(\d+)\s*d(?:ays?)?\b', re.IGNORECASE)
+NIGHTS_RE = re.compile(r'(\d+)\s*n(?:ights?)?\b', re.IGNORECASE)
+
+
+def parse_duration(text):
+    """Parse "4 Days / 3 Nights" (or "3N/4D", "5 days") into (days, nights)."""
+    days = DAYS_RE.search(text or '')
+    nights = NIGHTS_RE.search(text or '')
+    days = int(days.group(1)) if days else None
+    nights = int(nights.group(1)) if nights else None
+    if days is None and nights is not None:
+        days = nights + 1
+    elif nights is None and days is not None:
+        nights = max(days - 1, 0)
+    return days, nights
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = 'Categories'
@@ -19,9 +40,14 @@ class Package(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     image = models.ImageField(upload_to='package_images/')
+    # Widths of the resized copies written by packages.images, empty until built.
+    image_widths = models.JSONField(default=list, blank=True, editable=False)
     rating = models.DecimalField(max_digits=2, decimal_places=1, default=0)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     duration = models.CharField(max_length=50, help_text="e.g., 4 Days / 3 Nights")
+    # Parsed from `duration` on save so trips can be filtered and sorted by length.
+    days = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    nights = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
 
     include_meals = models.BooleanField(default=False)
     include_hotels = models.BooleanField(default=False)
@@ -33,10 +59,36 @@ class Package(models.Model):
     # (extend: add a related Itinerary model later)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Maintained by packages.search on Postgres; SQLite keeps an FTS5 table instead.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on the catalog walks (created_at, id) newest-first.
+            models.Index(fields=['-created_at', '-id'], name='package_created_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='package_cat_created_idx'),
+            # Facet filters: price bands within a category, and price + rating floor.
+            models.Index(fields=['category', 'price'], name='package_cat_price_idx'),
+            models.Index(fields=['price', 'rating'], name='package_price_rating_idx'),
+            # "3-5 day trips sorted by price"
+            models.Index(fields=['days', 'price'], name='package_days_price_idx'),
+            # MAX(updated_at) for conditional GETs on the catalog and per category.
+            models.Index(fields=['updated_at'], name='package_updated_idx'),
+            models.Index(fields=['category', 'updated_at'], name='package_cat_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.days, self.nights = parse_duration(self.duration)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'duration' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'days', 'nights'}
+        super().save(*args, **kwargs)
+
     def get_inclusions(self):
         inclusions = []
         if self.include_meals: inclusions.append("Meals")
@@ -45,3 +97,82 @@ class Package(models.Model):
         if self.include_sightseeing: inclusions.append("Sightseeing")
         if self.custom_includes: inclusions.append(self.custom_includes)
         return inclusions
+
+
+class DepartureQuerySet(models.QuerySet):
+    def bookable(self):
+        """Departures checkout offers: not yet left, with seats remaining."""
+        return self.filter(date__gte=timezone.localdate(), seats_left__gt=0)
+
+
+class Departure(models.Model):
+    """A dated run of a package with a fixed number of seats."""
+    package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name='departures')
+    date = models.DateField()
+    capacity = models.PositiveIntegerField()
+    # Decremented by bookings.inventory; starts at `capacity` when left blank.
+    seats_left = models.PositiveIntegerField(blank=True)
+
+    objects = DepartureQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['package', 'date'], name='departure_package_date_uniq'),
+            models.CheckConstraint(
+                check=models.Q(seats_left__lte=models.F('capacity')),
+                name='departure_seats_within_capacity',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.package} on {self.date:%d %b %Y}"
+
+    def save(self, *args, **kwargs):
+        if self.seats_left is None:
+            self.seats_left = self.capacity
+        super().save(*args, **kwargs)
+
+
+class PriceRule(models.Model):
+    """
+    One adjustment to a package's per-person price, compiled into a lookup
+    table by packages.pricing. Percentages are signed: -10 is a 10% discount.
+    """
+    SEASON = 'season'
+    GROUP = 'group'
+    CHILD = 'child'
+    SURCHARGE = 'surcharge'
+    KIND_CHOICES = (
+        (SEASON, 'Seasonal rate (percent, for departures in a date range)'),
+        (GROUP, 'Group tier (percent, from a number of persons)'),
+        (CHILD, 'Child price (percent of the adult price)'),
+        (SURCHARGE, 'Surcharge (flat amount or percent, optionally dated)'),
+    )
+    package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name='price_rules')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    label = models.CharField(max_length=100, blank=True)
+    start_date = models.DateField(blank=True, null=True)
+    end_date = models.DateField(blank=True, null=True)
+    min_persons = models.PositiveSmallIntegerField(blank=True, null=True)
+    percent = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    per_person = models.BooleanField(default=True, help_text="Surcharges: charge the amount per person rather than per booking.")
+
+    class Meta:
+        ordering = ['package', 'kind', 'start_date', 'min_persons']
+
+    def __str__(self):
+        return f"{self.package}: {self.label or self.get_kind_display()}"
+
+    def clean(self):
+        if self.kind == self.SEASON and not (self.start_date and self.end_date and self.percent is not None):
+            raise ValidationError("Seasonal rates need a start date, an end date and a percent.")
+        if self.kind == self.GROUP and not (self.min_persons and self.percent is not None):
+            raise ValidationError("Group tiers need a minimum number of persons and a percent.")
+        if self.kind == self.CHILD and self.percent is None:
+            raise ValidationError("Child prices need a percent of the adult price.")
+        if self.kind == self.SURCHARGE and (self.amount is None) == (self.percent is None):
+            raise ValidationError("Surcharges need either an amount or a percent.")
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValidationError("The start date must not be after the end date.")
@@ -0,0 +1,214 @@
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+from . import cache as page_cache
+from .models import Departure, PriceRule
+
+MINOR_UNITS = 100  # paise per rupee
+CURRENCY = 'inr'
+PRICING = 'pricing'  # version scope in packages.cache, keyed by package id
+
+# Rules are compiled into sorted tables and quoted in integer paise.
+# package id -> (version, CompiledRules), refreshed when the version moves.
+_compiled = {}
+
+
+def to_minor(amount):
+    return int((Decimal(amount) * MINOR_UNITS).to_integral_value(ROUND_HALF_UP))
+
+
+def from_minor(minor):
+    return (Decimal(minor) / MINOR_UNITS).quantize(Decimal('0.01'))
+
+
+def _adjust(minor, percent):
+    """Apply a signed percentage to an amount in minor units, rounding half up."""
+    if not percent:
+        return minor
+    return int((Decimal(minor) * (100 + percent) / 100).to_integral_value(ROUND_HALF_UP))
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    # Seasons sorted by start; starts kept separately for bisect.
+    season_starts: tuple = ()
+    seasons: tuple = ()            # (start ordinal, end ordinal, percent)
+    tier_minimums: tuple = ()      # ascending
+    tier_percents: tuple = ()
+    child_percent: Decimal = None
+    surcharges: tuple = ()         # (label, start ordinal, end ordinal, percent, amount minor, per person)
+
+    def season_percent(self, day):
+        """The latest-starting season covering ``day`` wins; no season is 0%."""
+        if day is None:
+            return 0
+        ordinal = day.toordinal()
+        for i in range(bisect_right(self.season_starts, ordinal) - 1, -1, -1):
+            _start, end, percent = self.seasons[i]
+            if end >= ordinal:
+                return percent
+        return 0
+
+    def tier_percent(self, persons):
+        i = bisect_right(self.tier_minimums, persons)
+        return self.tier_percents[i - 1] if i else 0
+
+
+EMPTY_RULES = CompiledRules()
+
+
+def compile_rules(rules):
+    seasons, tiers, surcharges = [], [], []
+    child_percent = None
+    for rule in rules:
+        start = rule.start_date.toordinal() if rule.start_date else None
+        end = rule.end_date.toordinal() if rule.end_date else None
+        if rule.kind == PriceRule.SEASON:
+            seasons.append((start, end, rule.percent))
+        elif rule.kind == PriceRule.GROUP:
+            tiers.append((rule.min_persons, rule.percent))
+        elif rule.kind == PriceRule.CHILD:
+            child_percent = rule.percent
+        elif rule.kind == PriceRule.SURCHARGE:
+            amount = to_minor(rule.amount) if rule.amount is not None else None
+            surcharges.append((rule.label or 'Surcharge', start, end, rule.percent, amount, rule.per_person))
+    if not (seasons or tiers or surcharges or child_percent is not None):
+        return EMPTY_RULES
+    seasons.sort(key=lambda season: season[0])
+    tiers.sort()
+    return CompiledRules(
+        season_starts=tuple(season[0] for season in seasons),
+        seasons=tuple(seasons),
+        tier_minimums=tuple(tier[0] for tier in tiers),
+        tier_percents=tuple(tier[1] for tier in tiers),
+        child_percent=child_percent,
+        surcharges=tuple(surcharges),
+    )
+
+
+def get_rules(package_ids):
+    """
+    Compiled rules for several packages: one cache round-trip for their
+    versions, and one query for whichever aren't compiled yet.
+    """
+    package_ids = list(dict.fromkeys(package_ids))
+    versions = page_cache.get_versions(*((PRICING, pk) for pk in package_ids))
+    # Without a shared cache another worker's rule change never reaches this
+    # one's versions, and a stale memo would charge the old price.
+    memoise = page_cache.is_shared()
+    result, stale = {}, {}
+    for pk, version in zip(package_ids, versions):
+        cached = _compiled.get(pk) if memoise else None
+        if cached and cached[0] == version:
+            result[pk] = cached[1]
+        else:
+            stale[pk] = version
+    if stale:
+        rules = defaultdict(list)
+        for rule in PriceRule.objects.filter(package_id__in=stale):
+            rules[rule.package_id].append(rule)
+        for pk, version in stale.items():
+            compiled = compile_rules(rules[pk])
+            if memoise:
+                _compiled[pk] = (version, compiled)
+            result[pk] = compiled
+    return result
+
+
+def invalidate(package_id):
+    page_cache.bump_version(PRICING, package_id)
+
+
+@dataclass(frozen=True)
+class Quote:
+    adults: int
+    children: int
+    adult_unit_minor: int
+    child_unit_minor: int
+    surcharges: tuple  # (label, minor)
+    total_minor: int
+    currency: str = CURRENCY
+
+    @property
+    def total(self):
+        return from_minor(self.total_minor)
+
+    @property
+    def adult_unit(self):
+        return from_minor(self.adult_unit_minor)
+
+
+def price(base_price, rules, adults, children=0, day=None):
+    """Quote with already-compiled rules; no database or cache access."""
+    persons = adults + children
+    unit = _adjust(to_minor(base_price), rules.season_percent(day))
+    unit = _adjust(unit, rules.tier_percent(persons))
+    child_unit = unit if rules.child_percent is None else _adjust(unit, rules.child_percent - 100)
+    subtotal = adults * unit + children * child_unit
+
+    ordinal = day.toordinal() if day else None
+    lines = []
+    for label, start, end, percent, amount, per_person in rules.surcharges:
+        if start is not None or end is not None:
+            if ordinal is None or (start is not None and ordinal < start) or (end is not None and ordinal > end):
+                continue
+        if amount is not None:
+            charge = amount * persons if per_person else amount
+        else:
+            charge = _adjust(subtotal, percent) - subtotal
+        lines.append((label, charge))
+    return Quote(
+        adults=adults,
+        children=children,
+        adult_unit_minor=unit,
+        child_unit_minor=child_unit,
+        surcharges=tuple(lines),
+        total_minor=subtotal + sum(charge for _label, charge in lines),
+    )
+
+
+def quote(package, adults, children=0, day=None):
+    return price(package.price, get_rules([package.pk])[package.pk], adults, children, day)
+
+
+def quote_many(requests):
+    """
+    Quote several (package, adults, children, day) requests with a single
+    rules lookup. Returns the quotes in the same order.
+    """
+    requests = list(requests)
+    rules = get_rules(package.pk for package, *_ in requests)
+    return [
+        price(package.price, rules[package.pk], adults, children, day)
+        for package, adults, children, day in requests
+    ]
+
+
+def from_price(base_price, rules, days=(None,)):
+    """
+    The lowest price one adult pays on any of ``days`` (the bookable
+    departure dates, or None for a package booked without one). It is
+    price() itself, so the advertised figure is always a real quote. Group
+    discounts aren't included since they need a larger party.
+    """
+    return from_minor(min(price(base_price, rules, adults=1, day=day).total_minor for day in days))
+
+
+def attach_from_prices(packages):
+    """
+    Set ``from_price`` on every package with one rules lookup and one
+    departures query; returns them.
+    """
+    packages = list(packages)
+    if not packages:
+        return packages
+    rules = get_rules(package.pk for package in packages)
+    days = defaultdict(set)
+    departures = Departure.objects.bookable().filter(package__in=packages).values_list('package_id', 'date')
+    for package_id, day in departures:
+        days[package_id].add(day)
+    for package in packages:
+        package.from_price = from_price(package.price, rules[package.pk], days.get(package.pk) or (None,))
+    return packages
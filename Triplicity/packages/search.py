@@ -0,0 +1,108 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Package
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'packages_package_fts'
+PAGE_SIZE = 12
+
+
+def _package_vector():
+    category_name = Subquery(
+        Category.objects.filter(pk=OuterRef('category_id')).values('name')[:1]
+    )
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(category_name, Value('')), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('short_itinerary', weight='C', config=SEARCH_CONFIG)
+        + SearchVector('custom_includes', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_index(packages):
+    """Re-index the given Package queryset in place."""
+    if connection.vendor == 'postgresql':
+        # .update() sends no signals, so this can't recurse into post_save.
+        packages.update(search_vector=_package_vector())
+    elif connection.vendor == 'sqlite':
+        ids = list(packages.values_list('pk', flat=True))
+        if ids:
+            _sqlite_reindex(ids)
+
+
+def remove_from_search_index(package_ids):
+    if connection.vendor == 'sqlite' and package_ids:
+        placeholders = ', '.join(['%s'] * len(package_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", package_ids)
+
+
+def _sqlite_reindex(ids):
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, category, itinerary, includes) "
+            f"SELECT p.id, p.title, COALESCE(c.name, ''), p.short_itinerary, p.custom_includes "
+            f"FROM packages_package p LEFT JOIN packages_category c ON c.id = p.category_id "
+            f"WHERE p.id IN ({placeholders})",
+            ids,
+        )
+
+
+def search_packages(query, page=1, page_size=PAGE_SIZE):
+    """
+    Return (packages, has_next) for one page of results, best match first.
+    """
+    terms = re.findall(r'\w+', query or '')
+    if not terms:
+        return [], False
+    offset = (page - 1) * page_size
+    limit = page_size + 1
+
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        results = list(
+            Package.objects.select_related('category')
+            .defer('search_vector')
+            .filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', '-created_at', '-id')[offset:offset + limit]
+        )
+    elif connection.vendor == 'sqlite':
+        results = _sqlite_search(terms, offset, limit)
+    else:
+        match = Q()
+        for term in terms:
+            match &= (
+                Q(title__icontains=term)
+                | Q(category__name__icontains=term)
+                | Q(short_itinerary__icontains=term)
+                | Q(custom_includes__icontains=term)
+            )
+        results = list(
+            Package.objects.select_related('category')
+            .filter(match)
+            .order_by('-rating', '-created_at')[offset:offset + limit]
+        )
+    return results[:page_size], len(results) > page_size
+
+
+def _sqlite_search(terms, offset, limit):
+    # Quote every term so user input can't inject FTS5 query syntax, and
+    # prefix-match it so partial words still hit.
+    match = ' '.join('"%s"*' % term for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 1.0, 1.0) LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    packages = Package.objects.select_related('category').in_bulk(ids)
+    return [packages[pk] for pk in ids if pk in packages]
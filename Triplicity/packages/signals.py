@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import autocomplete
+from . import cache as page_cache
+from . import pricing
+from .images import schedule_derivatives
+from .models import Category, Package, PriceRule
+from .search import remove_from_search_index, update_search_index
+
+
+@receiver(pre_save, sender=Package)
+def remember_previous_package(sender, instance, raw=False, **kwargs):
+    # A save can move a package to another category or slug; the pages it
+    # is leaving have to be invalidated as well as the ones it lands on.
+    instance._previous = None
+    if instance.pk and not raw:
+        instance._previous = (
+            Package.objects.filter(pk=instance.pk)
+            .values('slug', 'category__slug', 'image')
+            .first()
+        )
+        if instance._previous and instance._previous['image'] != instance.image.name:
+            # The old derivatives belong to the old file; rebuild from scratch.
+            instance.image_widths = []
+
+
+@receiver(post_save, sender=Package)
+def reindex_package(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_search_index(Package.objects.filter(pk=instance.pk))
+    previous = getattr(instance, '_previous', None)
+    page_cache.invalidate_package_pages(instance, previous)
+    transaction.on_commit(lambda: autocomplete.record_change('package', instance.pk))
+
+    image_changed = previous is None or previous['image'] != instance.image.name
+    if instance.image and image_changed:
+        transaction.on_commit(lambda: schedule_derivatives(instance.pk))
+
+
+@receiver(post_delete, sender=Package)
+def unindex_package(sender, instance, **kwargs):
+    remove_from_search_index([instance.pk])
+    page_cache.invalidate_package_pages(instance)
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.record_change('package', pk))
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_packages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_search_index(Package.objects.filter(category=instance))
+    page_cache.bump_version(page_cache.CATEGORIES)
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.record_change('category', pk))
+
+
+@receiver(post_delete, sender=Category)
+def reindex_uncategorised_packages(sender, instance, **kwargs):
+    # SET_NULL has already detached this category's packages by now.
+    update_search_index(Package.objects.filter(category__isnull=True))
+    page_cache.bump_version(page_cache.CATEGORIES)
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.record_change('category', pk))
+
+
+@receiver(post_save, sender=PriceRule)
+@receiver(post_delete, sender=PriceRule)
+def reprice_package(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pricing.invalidate(instance.package_id)
+    # "From" prices are on the package's pages: move their validators
+    # (Last-Modified/ETag come from updated_at) and drop cached copies.
+    Package.objects.filter(pk=instance.package_id).update(updated_at=timezone.now())
+    package = Package.objects.select_related('category').filter(pk=instance.package_id).first()
+    if package is not None:
+        page_cache.invalidate_package_pages(package)
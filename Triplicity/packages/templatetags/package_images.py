@@ -0,0 +1,48 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import PRESETS, derivative_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def package_picture(package, preset='card', css_class='', sizes=None):
+    """
+    Render a package image as a <picture> with WebP and JPEG srcsets.
+
+    Falls back to the original upload until its derivatives have been built.
+    """
+    if not package.image:
+        return ''
+    target_width, default_sizes = PRESETS[preset]
+    sizes = sizes or default_sizes
+    loading = 'eager' if preset == 'hero' else 'lazy'
+    priority = 'high' if preset == 'hero' else 'auto'
+
+    widths = package.image_widths
+    if not widths:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}" fetchpriority="{}">',
+            package.image.url, css_class, package.title, loading, priority,
+        )
+
+    storage = package.image.storage
+    name = package.image.name
+
+    def srcset(extension):
+        return format_html_join(
+            ', ', '{} {}w',
+            ((storage.url(derivative_name(name, width, extension)), width) for width in widths),
+        )
+
+    fallback_width = min((w for w in widths if w >= target_width), default=max(widths))
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" loading="{}" fetchpriority="{}">'
+        '</picture>',
+        srcset('webp'), sizes,
+        storage.url(derivative_name(name, fallback_width, 'jpg')), srcset('jpg'), sizes,
+        css_class, package.title, loading, priority,
+    )
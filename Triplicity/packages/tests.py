@@ -1,3 +1,53 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from . import pricing
+from .models import Departure, Package, PriceRule
+
+
+class FromPriceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        self.package = Package.objects.create(
+            title='Goa Beaches', slug='goa-beaches', price=1000, duration='3 Days / 2 Nights',
+        )
+        self.peak, self.regular, self.lean = (today + timedelta(days=n) for n in (10, 20, 30))
+        for day in (self.peak, self.regular, self.lean):
+            Departure.objects.create(package=self.package, date=day, capacity=10)
+        # The cheapest date is sold out, so it isn't on offer.
+        Departure.objects.filter(package=self.package, date=self.lean).update(seats_left=0)
+
+        PriceRule.objects.create(package=self.package, kind=PriceRule.SEASON, start_date=self.peak,
+                                 end_date=self.peak, percent=20)
+        PriceRule.objects.create(package=self.package, kind=PriceRule.SEASON, start_date=self.lean,
+                                 end_date=self.lean, percent=-10)
+        PriceRule.objects.create(package=self.package, kind=PriceRule.GROUP, min_persons=4, percent=-15)
+        PriceRule.objects.create(package=self.package, kind=PriceRule.SURCHARGE, label='Booking fee',
+                                 amount=50, per_person=False)
+
+    def test_from_price_is_one_adults_quote_on_the_cheapest_bookable_date(self):
+        package, = pricing.attach_from_prices([Package.objects.get(pk=self.package.pk)])
+
+        self.assertEqual(package.from_price, Decimal('1050.00'))
+        self.assertEqual(package.from_price, pricing.quote(package, adults=1, day=self.regular).total)
+        self.assertLess(package.from_price, pricing.quote(package, adults=1, day=self.peak).total)
+
+    def test_from_price_without_departures_is_the_undated_quote(self):
+        Departure.objects.filter(package=self.package).delete()
+
+        package, = pricing.attach_from_prices([Package.objects.get(pk=self.package.pk)])
+
+        self.assertEqual(package.from_price, pricing.quote(package, adults=1).total)
+
+    def test_group_discount_lowers_the_quote_not_the_from_price(self):
+        package, = pricing.attach_from_prices([Package.objects.get(pk=self.package.pk)])
+        group = pricing.quote(package, adults=4, day=self.regular)
 
-# Create your tests here.
+        self.assertEqual(group.adult_unit, Decimal('850.00'))
+        self.assertEqual(group.total, Decimal('3450.00'))
+        self.assertEqual(package.from_price, Decimal('1050.00'))
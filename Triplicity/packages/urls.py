@@ -6,5 +6,7 @@ app_name = 'packages'
 urlpatterns = [
     path('', views.package_list, name='list'), # name = 'list' - for html
     path('category/<slug:category_slug>/', views.package_list, name='list_by_category'),
+    path('search/', views.package_search, name='search'),
+    path('autocomplete/', views.package_autocomplete, name='autocomplete'),
     path('<slug:package_slug>/', views.package_detail, name='detail'), 
 ]
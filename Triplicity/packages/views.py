@@ -1,25 +1,85 @@
 from django.shortcuts import render
 
 # Create your views here.
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
+from django.utils.functional import SimpleLazyObject
+from .autocomplete import suggest
+from .cache import (
+    cache_page_versioned, conditional_detail_page, conditional_list_page,
+    detail_cache_key, list_cache_key,
+)
+from .filters import PackageFilter
 from .models import Category, Package
+from .pagination import keyset_paginate
+from .pricing import attach_from_prices
+from .search import search_packages
 
+@conditional_list_page
+@cache_page_versioned('list', list_cache_key)
 def package_list(request, category_slug=None):
     categories = Category.objects.all().order_by('name')
-    packages = Package.objects.select_related('category').all().order_by('-created_at')
+    packages = Package.objects.select_related('category').all()
     selected_category = None
 
     if category_slug:
         selected_category = get_object_or_404(Category, slug=category_slug)
         packages = packages.filter(category=selected_category)
 
+    package_filter = PackageFilter(request.GET)
+    # Lazy so that a fragment-cache hit in the template skips these queries.
+    page = SimpleLazyObject(lambda: _with_from_prices(keyset_paginate(
+        package_filter.apply(packages),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )))
+
     context = {
         'categories': categories,
-        'packages': packages,
+        'packages': page,
+        'page': page,
         'selected_category': selected_category,
+        'facets': lambda: package_filter.facets(packages),
+        'filter_query': package_filter.querystring(),
+        'fragment_key': list_cache_key(request, category_slug),
     }
     return render(request, 'packages/package_list.html', context)
 
+def _with_from_prices(page):
+    # One rules lookup for the whole page; see packages.pricing.
+    attach_from_prices(page.object_list)
+    return page
+
+@conditional_detail_page
+@cache_page_versioned('detail', detail_cache_key)
 def package_detail(request, package_slug):
-    package = get_object_or_404(Package, slug=package_slug)
+    package = get_object_or_404(Package.objects.select_related('category'), slug=package_slug)
+    attach_from_prices([package])
     return render(request, 'packages/package_detail.html', {'package': package})
+
+def package_search(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        page_number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page_number = 1
+
+    packages, has_next = search_packages(query, page=page_number)
+    packages = attach_from_prices(packages)
+
+    context = {
+        'categories': Category.objects.all().order_by('name'),
+        'query': query,
+        'packages': packages,
+        'page_number': page_number,
+        'has_next': has_next,
+        'has_previous': page_number > 1,
+        'next_page': page_number + 1,
+        'previous_page': page_number - 1,
+    }
+    return render(request, 'packages/package_search.html', context)
+
+def package_autocomplete(request):
+    response = JsonResponse({'results': suggest(request.GET.get('q', ''))})
+    response['Cache-Control'] = 'public, max-age=60'
+    return response